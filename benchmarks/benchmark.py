@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from dataset_generator import generate_dataset
+
+from vds.api import create_plugins, Options
+from vds.registry import list_plugin_metadata, load_plugin_modules
+
+BASELINES_PATH = Path(__file__).parent / 'baselines'
+DEFAULT_SIZES = '1000,10000,100000'
+
+Results = Dict[str, Dict[str, float]]
+
+
+def prepare_dataset(data_path: Path, size: int, seed: int) -> Path:
+    # Datasets are generated once and reused, creating 100k files takes longer than checking them
+    path = data_path / f'lj-{size}-{seed}'
+    if not (path / '.complete').exists():
+        print(f'Generating dataset with {size} files in {path}', file=sys.stderr)
+        generate_dataset(path, size, seed=seed)
+        (path / '.complete').touch()
+    return path
+
+
+def best_time(function: Callable[[], float], repeat: int) -> float:
+    return min(function() for _ in range(repeat))
+
+
+def time_dataset_index(path: Path) -> float:
+    start = time.perf_counter()
+    create_plugins(Options(path=str(path), cache=False), [])
+    return time.perf_counter() - start
+
+
+def time_plugin(path: Path, plugin_module: object) -> float:
+    # Every plugin gets a new dataset index, so work shared between plugins (like reading WAV headers) is counted
+    # for each plugin that needs it
+    (vds_plugin,) = create_plugins(Options(path=str(path), cache=False), [plugin_module])
+    start = time.perf_counter()
+    vds_plugin.run()
+    return time.perf_counter() - start
+
+
+def time_main(path: Path) -> float:
+    # The whole command, with the interpreter start and printing of the report
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'vds.main', '--args.path', str(path), '--cache.disable'],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+    )
+    return time.perf_counter() - start
+
+
+def run_benchmarks(data_path: Path, sizes: List[int], repeat: int, seed: int) -> Results:
+    results: Results = {}
+    # Opt-in plugins are timed too
+    plugin_modules = load_plugin_modules(enabled_plugins=[info.id for info in list_plugin_metadata()])
+
+    for size in sizes:
+        path = prepare_dataset(data_path, size, seed)
+        timings = {'DatasetIndex': best_time(partial(time_dataset_index, path), repeat)}
+
+        for plugin_module in plugin_modules:
+            plugin_id = plugin_module.ValidDataSetPlugin.info.id
+            timings[plugin_id] = best_time(partial(time_plugin, path, plugin_module), repeat)
+
+        timings['main'] = best_time(partial(time_main, path), repeat)
+        results[str(size)] = timings
+
+        for name, seconds in timings.items():
+            print(f'{size:>7} {name:>12}: {seconds * 1000:10.1f} ms')
+    return results
+
+
+def save_baseline(name: str, results: Results) -> Path:
+    BASELINES_PATH.mkdir(exist_ok=True)
+    path = BASELINES_PATH / f'{name}.json'
+    content = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    path.write_text(json.dumps(content, indent=4) + '\n', encoding='UTF-8')
+    return path
+
+
+def compare_with_baseline(name: str, results: Results, tolerance: float) -> bool:
+    # Returns False when something is slower than the baseline by more than the tolerance
+    baseline = json.loads((BASELINES_PATH / f'{name}.json').read_text(encoding='UTF-8'))['results']
+    passed = True
+
+    print(f'\n{"size":>7} {"name":>12} {"baseline":>12} {"current":>12} {"ratio":>7}')
+    for size, timings in results.items():
+        for timing_name, seconds in timings.items():
+            baseline_seconds = baseline.get(size, {}).get(timing_name)
+            if not baseline_seconds:
+                continue
+
+            ratio = seconds / baseline_seconds
+            status = ''
+            if ratio > 1 + tolerance:
+                status = 'SLOWER'
+                passed = False
+            elif ratio < 1 - tolerance:
+                status = 'faster'
+            print(
+                f'{size:>7} {timing_name:>12} {baseline_seconds * 1000:9.1f} ms {seconds * 1000:9.1f} ms '
+                f'{ratio:7.2f} {status}',
+            )
+    return passed
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description='Measure time of every plugin on generated datasets.')
+    argument_parser.add_argument(
+        '--sizes', type=str, default=DEFAULT_SIZES, help=f'Numbers of WAV files (default: {DEFAULT_SIZES})',
+    )
+    argument_parser.add_argument('--repeat', type=int, default=3, help='Number of runs, the best one is used')
+    argument_parser.add_argument('--seed', type=int, default=0, help='Seed of the dataset generator')
+    argument_parser.add_argument(
+        '--data-path', type=Path, default=Path('/tmp/vds-benchmark'), help='Folder for generated datasets',
+    )
+    argument_parser.add_argument('--save', type=str, default=None, help='Save results as the baseline with this name')
+    argument_parser.add_argument('--compare', type=str, default=None, help='Compare results with this baseline')
+    argument_parser.add_argument(
+        '--tolerance', type=float, default=0.2, help='Allowed slowdown in comparison with the baseline (default: 0.2)',
+    )
+    arguments = argument_parser.parse_args()
+
+    sizes = [int(size) for size in arguments.sizes.split(',')]
+    results = run_benchmarks(arguments.data_path, sizes, arguments.repeat, arguments.seed)
+
+    if arguments.save:
+        print(f'Baseline saved in {save_baseline(arguments.save, results)}')
+
+    if arguments.compare and not compare_with_baseline(arguments.compare, results, arguments.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
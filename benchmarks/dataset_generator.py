@@ -0,0 +1,119 @@
+import argparse
+import random
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SAMPLE_RATE = 22050
+BITS_PER_SAMPLE = 16
+
+# Problems found by the plugins, every defective WAV file or transcription line gets one of them
+WAV_DEFECTS = ('truncated', 'metadata', 'not_a_wav', 'sample_rate', 'stereo', 'too_short', 'too_long', 'orphan')
+LINE_DEFECTS = ('empty_line', 'missing_wav', 'empty_transcription', 'no_punctuation', 'extra_pipe', 'duplicate')
+
+WORDS = (
+    'the', 'printing', 'press', 'was', 'invented', 'in', 'germany', 'and', 'soon', 'spread', 'over', 'europe',
+    'while', 'books', 'became', 'cheaper', 'every', 'year', 'after', 'that', 'many', 'readers', 'appeared',
+)
+
+
+def wav_header(data_size: int, sample_rate: int = SAMPLE_RATE, channels: int = 1, extra_chunks: bytes = b'') -> bytes:
+    block_align = channels * BITS_PER_SAMPLE // 8
+    fmt_chunk = struct.pack(
+        '<4sIHHIIHH', b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, BITS_PER_SAMPLE,
+    )
+    data_chunk_header = struct.pack('<4sI', b'data', data_size)
+    riff_size = 4 + len(fmt_chunk) + len(extra_chunks) + len(data_chunk_header) + data_size
+    return struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE') + fmt_chunk + extra_chunks + data_chunk_header
+
+
+def write_wav(path: Path, duration_ms: int, defect: Optional[str]) -> None:
+    sample_rate = 16000 if defect == 'sample_rate' else SAMPLE_RATE
+    channels = 2 if defect == 'stereo' else 1
+    data_size = sample_rate * duration_ms // 1000 * channels * BITS_PER_SAMPLE // 8
+    # Audacity adds chunks which scipy does not understand, like "id3 "
+    extra_chunks = struct.pack('<4sI', b'id3 ', 8) + bytes(8) if defect == 'metadata' else b''
+
+    with open(path, 'wb') as file:
+        if defect == 'not_a_wav':
+            file.write(b'ID3\x03\x00\x00\x00\x00\x00\x00' + bytes(range(256)))
+            return
+
+        header = wav_header(data_size, sample_rate, channels, extra_chunks)
+        file.write(header)
+        # Samples are silence, truncate() makes a sparse file, so even big datasets need little disk space
+        file.truncate(len(header) + (data_size // 2 if defect == 'truncated' else data_size))
+
+
+def sentence(rng: random.Random) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))).capitalize()
+
+
+def transcription_line(wav_path: str, text: str, defect: Optional[str]) -> List[str]:
+    if defect == 'empty_line':
+        return [f'{wav_path}|{text}.', '']
+    if defect == 'missing_wav':
+        return [f'{wav_path}|{text}.', f'{wav_path[:-4]}_missing.wav|{text}.']
+    if defect == 'empty_transcription':
+        return [f'{wav_path}|']
+    if defect == 'no_punctuation':
+        return [f'{wav_path}|{text}']
+    if defect == 'extra_pipe':
+        return [f'{wav_path}|{text}|{text}.']
+    if defect == 'duplicate':
+        return [f'{wav_path}|{text}.', f'{wav_path}|{text}.']
+    return [f'{wav_path}|{text}.']
+
+
+def generate_dataset(
+        path: Path, size: int, defect_rate: float = 0.02, validation_part: float = 0.05, seed: int = 0,
+) -> Dict[str, int]:
+    # Returns how many defects of every kind were injected
+    rng = random.Random(seed)
+    (path / 'wavs').mkdir(parents=True, exist_ok=True)
+
+    injected = {defect: 0 for defect in WAV_DEFECTS + LINE_DEFECTS}
+    lines: List[Tuple[str, List[str]]] = []
+
+    for index in range(size):
+        wav_path = f'wavs/LJ{index // 10000:03d}-{index % 10000:04d}.wav'
+        wav_defect = rng.choice(WAV_DEFECTS) if rng.random() < defect_rate else None
+        line_defect = rng.choice(LINE_DEFECTS) if wav_defect is None and rng.random() < defect_rate else None
+
+        duration_ms = rng.randint(2500, 9500)
+        if wav_defect == 'too_short':
+            duration_ms = 1000
+        elif wav_defect == 'too_long':
+            duration_ms = 12000
+        write_wav(path / wav_path, duration_ms, wav_defect)
+
+        for defect in (wav_defect, line_defect):
+            if defect:
+                injected[defect] += 1
+
+        if wav_defect != 'orphan':
+            file_name = 'list_val.txt' if rng.random() < validation_part else 'list_train.txt'
+            lines.append((file_name, transcription_line(wav_path, sentence(rng), line_defect)))
+
+    for file_name in ('list_train.txt', 'list_val.txt'):
+        with open(path / file_name, 'w', encoding='UTF-8') as file:
+            file.write('\n'.join(line for name, group in lines if name == file_name for line in group))
+            file.write('\n')
+    return injected
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description='Generate a LJ Speech like dataset with known problems.')
+    argument_parser.add_argument('path', type=Path, help='Folder of the new dataset')
+    argument_parser.add_argument('--size', type=int, default=1000, help='Number of WAV files')
+    argument_parser.add_argument('--defect-rate', type=float, default=0.02, help='Part of files with problems')
+    argument_parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+    arguments = argument_parser.parse_args()
+
+    injected = generate_dataset(arguments.path, arguments.size, arguments.defect_rate, seed=arguments.seed)
+    for defect, count in injected.items():
+        print(f'{defect:>20}: {count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+from typing import Any
+
+__all__ = ['Options', 'PluginResult', 'validate']
+
+
+def __getattr__(name: str) -> Any:
+    # The API is imported on first use, so "python -m vds.main" does not load it before parsing the arguments
+    if name in __all__:
+        from vds import api  # pylint: disable=import-outside-toplevel
+        return getattr(api, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,151 @@
+import argparse
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, NamedTuple, Optional, Tuple, Union
+
+from vds.cache import CACHE_FILE_NAME, ProbeCache
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, FindingWriter, Findings
+from vds.paths import is_archive
+from vds.prefetch import IOLimits
+from vds.registry import list_plugin_metadata, load_plugin_modules
+from vds.scheduler import PluginScheduler
+
+
+class Options(NamedTuple):
+    path: str
+    files: Tuple[str, ...] = ('list_train.txt', 'list_val.txt')
+    dir_name: str = 'wavs'
+    sample_rate: int = 22050
+    number_of_channels: int = 1
+    min_duration: int = 2000
+    max_duration: int = 10000
+    number_of_pipes: int = 1
+    disabled_plugins: Tuple[str, ...] = ()
+    enabled_plugins: Tuple[str, ...] = ()
+    jobs: int = 1
+    cache: bool = True
+    rebuild_cache: bool = False
+    io_threads: int = 0
+    io_in_flight: int = 0
+    max_errors: Optional[int] = None
+
+    @classmethod
+    def from_arguments(cls, arguments: argparse.Namespace) -> 'Options':
+        return cls(
+            path=str(arguments.args_path),
+            files=tuple(str(arguments.args_files).split(',')),
+            dir_name=str(arguments.args_dir_name),
+            sample_rate=arguments.args_sample_rate,
+            number_of_channels=arguments.args_number_of_channels,
+            min_duration=arguments.args_min_duration,
+            max_duration=arguments.args_max_duration,
+            number_of_pipes=arguments.args_number_of_pipes,
+            disabled_plugins=tuple(arguments.plugins_disable.split(',')),
+            enabled_plugins=tuple(arguments.plugins_enable.split(',')),
+            jobs=arguments.jobs,
+            cache=not arguments.cache_disable,
+            rebuild_cache=arguments.cache_rebuild,
+            io_threads=arguments.io_threads,
+            io_in_flight=arguments.io_in_flight,
+            max_errors=arguments.max_errors,
+        )
+
+
+class PluginResult(NamedTuple):
+    plugin_id: str
+    name: str
+    status: str
+    total: int
+    findings: List[Finding]
+    failed_dependency: Optional[str] = None
+
+
+def archive_options(options: Options) -> Options:
+    # Samples of archive members can't be memory-mapped or read in parallel, so plugins reading them are disabled,
+    # and there is no folder to keep the cache in
+    if not is_archive(options.path):
+        return options
+    sample_plugins = tuple(metadata.id for metadata in list_plugin_metadata() if metadata.reads_samples)
+    return options._replace(disabled_plugins=options.disabled_plugins + sample_plugins, cache=False)
+
+
+def create_dataset(options: Options, probe_cache: Optional[ProbeCache] = None) -> DatasetIndex:
+    if is_archive(options.path):
+        from vds.archive import DatasetArchive  # pylint: disable=import-outside-toplevel
+
+        return DatasetIndex(
+            path=options.path,
+            files=list(options.files),
+            dir_name=options.dir_name,
+            archive=DatasetArchive(options.path, list(options.files), options.dir_name),
+        )
+
+    if probe_cache is None and options.cache:
+        probe_cache = ProbeCache(Path(options.path) / CACHE_FILE_NAME, rebuild=options.rebuild_cache)
+
+    return DatasetIndex(
+        path=options.path,
+        files=list(options.files),
+        dir_name=options.dir_name,
+        jobs=options.jobs,
+        cache=probe_cache,
+        io_limits=IOLimits(options.io_threads, options.io_in_flight),
+    )
+
+
+def create_plugins(
+        options: Options, plugin_modules: List[ModuleType], writer: Optional[FindingWriter] = None,
+        probe_cache: Optional[ProbeCache] = None, dataset: Optional[DatasetIndex] = None, batch: bool = False,
+) -> List[Any]:
+    # Everything a run changes lives in the returned plugin instances and their dataset, nothing is shared.
+    # In batch mode findings written by the writer are marked with the path of their dataset.
+    if dataset is None:
+        dataset = create_dataset(options, probe_cache)
+
+    plugins = []
+
+    for plugin_module in plugin_modules:
+        vds_plugin = plugin_module.init_plugin()
+        vds_plugin.args = {
+            'path': options.path,
+            'files': list(options.files),
+            'dir_name': options.dir_name,
+            'expected_properties': {
+                'sample_rate': options.sample_rate,
+                'number_of_channels': options.number_of_channels,
+                'min_duration': options.min_duration,
+                'max_duration': options.max_duration,
+                'number_of_pipes': options.number_of_pipes,
+            },
+        }
+        vds_plugin.dataset = dataset
+        vds_plugin.findings = Findings(writer, options.max_errors, options.path if batch else None)
+        plugins.append(vds_plugin)
+    return plugins
+
+
+def plugin_result(vds_plugin: Any, failed_dependency: Optional[str]) -> PluginResult:
+    status = 'skip' if failed_dependency else ('fail' if len(vds_plugin.findings) > 0 else 'ok')
+    return PluginResult(
+        plugin_id=vds_plugin.info.id,
+        name=vds_plugin.info.name,
+        status=status,
+        total=len(vds_plugin.findings),
+        findings=list(vds_plugin.findings),
+        failed_dependency=failed_dependency,
+    )
+
+
+def validate(path: Union[str, Path], probe_cache: Optional[ProbeCache] = None, **options: Any) -> List[PluginResult]:
+    # Keyword arguments are the fields of Options, for example files=('train.txt',) or max_errors=100.
+    # Each call has its own state, so it can be used many times (also concurrently) in one process.
+    run_options = archive_options(Options(path=str(path), **options))
+    plugin_modules = load_plugin_modules(run_options.disabled_plugins, run_options.enabled_plugins)
+    plugins = create_plugins(run_options, plugin_modules, probe_cache=probe_cache)
+
+    results = [
+        plugin_result(vds_plugin, failed_dependency)
+        for vds_plugin, failed_dependency in PluginScheduler(plugins).run()
+    ]
+    return sorted(results, key=lambda result: result.plugin_id)
@@ -0,0 +1,143 @@
+import importlib
+import io
+import os
+import posixpath
+from functools import partial
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO, Callable, cast, Dict, FrozenSet, IO, List, Optional, Set, Tuple
+
+from vds.riff import NOT_A_WAV_FILE, scan, WavHeader
+
+# Decompressed by the standard modules, their forward seek() is much faster than the one of tarfile streams.
+# Modules are imported only when an archive is opened, vds.paths.is_archive() recognizes archives without them.
+COMPRESSIONS: Dict[str, str] = {
+    '.gz': 'gzip', '.tgz': 'gzip', '.bz2': 'bz2', '.tbz2': 'bz2', '.xz': 'lzma', '.txz': 'lzma',
+}
+
+
+def open_archive_file(path: str) -> BinaryIO:
+    compression = COMPRESSIONS.get(os.path.splitext(path.lower())[1])
+    if compression is None:
+        return open(path, 'rb')  # pylint: disable=consider-using-with
+    return cast(BinaryIO, importlib.import_module(compression).open(path, 'rb'))
+
+
+def open_tar_member(archive: Any, member: Any) -> IO[bytes]:
+    import tarfile  # pylint: disable=import-outside-toplevel
+
+    file = archive.extractfile(member)
+    if file is None:
+        raise tarfile.ReadError(f'{member.name} is not a regular file')
+    return cast(IO[bytes], file)
+
+
+class DatasetArchive:
+    # Everything the plugins need from a dataset in a .tar(.gz/.bz2/.xz) or .zip archive, read without extracting it:
+    # names of the members, content of the transcription files and headers of the WAV files
+    __slots__ = (
+        'path', 'dir_name', 'transcription_names', 'top_names', 'root', 'files', 'directories', 'texts', 'headers',
+    )
+
+    path: str
+    dir_name: str
+    transcription_names: FrozenSet[str]
+    top_names: FrozenSet[str]
+    root: Optional[Tuple[str, ...]]
+    files: Set[str]
+    directories: Set[str]
+    texts: Dict[str, bytes]
+    headers: Dict[str, WavHeader]
+
+    def __init__(self, path: str, files: List[str], dir_name: str) -> None:
+        self.path = path
+        self.dir_name = str(PurePosixPath(dir_name))
+        self.transcription_names = frozenset(str(PurePosixPath(name)) for name in files)
+        self.top_names = frozenset(PurePosixPath(name).parts[0] for name in [*files, dir_name])
+        # Archives often keep the dataset in a folder (like LJSpeech-1.1/), it is found from the first known member
+        self.root = None
+        self.files = set()
+        self.directories = {'.'}
+        self.texts = {}
+        self.headers = {}
+
+        if path.lower().endswith('.zip'):
+            self.read_zip()
+        else:
+            self.read_tar()
+
+    def read_tar(self) -> None:
+        # Members are read in a single pass, every seek() goes forward. In an uncompressed archive the samples are
+        # skipped, so only the headers of the members and of the WAV files are read. A compressed one is decompressed
+        # once, as a stream, nothing is written to the disk.
+        import tarfile  # pylint: disable=import-outside-toplevel
+
+        from tqdm import tqdm  # type: ignore  # pylint: disable=import-outside-toplevel
+
+        with open_archive_file(self.path) as file, tarfile.open(fileobj=file, mode='r:') as archive:
+            for member in tqdm(archive, desc='Archive...', unit=' files'):
+                relative_path = self.relative_path(member.name)
+                if relative_path is not None and (member.isfile() or member.isdir()):
+                    self.add(relative_path, member.isdir(), member.size, partial(open_tar_member, archive, member))
+
+    def read_zip(self) -> None:
+        import zipfile  # pylint: disable=import-outside-toplevel
+
+        from tqdm import tqdm  # type: ignore  # pylint: disable=import-outside-toplevel
+
+        with zipfile.ZipFile(self.path) as archive:
+            for member in tqdm(archive.infolist(), desc='Archive...', unit=' files'):
+                relative_path = self.relative_path(member.filename)
+                if relative_path is not None:
+                    self.add(relative_path, member.is_dir(), member.file_size, partial(archive.open, member))
+
+    def relative_path(self, name: str) -> Optional[str]:
+        # Path of a member relative to the dataset folder, None for members outside of it
+        parts = PurePosixPath(posixpath.normpath('/' + name)).parts[1:]
+        if self.root is None:
+            self.root = next(
+                (parts[:depth] for depth in (0, 1) if len(parts) > depth and parts[depth] in self.top_names), None,
+            )
+        if self.root is None or parts[:len(self.root)] != self.root or len(parts) == len(self.root):
+            return None
+        return '/'.join(parts[len(self.root):])
+
+    def add(self, relative_path: str, is_directory: bool, size: int, open_member: Callable[[], IO[bytes]]) -> None:
+        # Archives don't need entries for folders, every parent folder of a member exists
+        parent = PurePosixPath(relative_path).parent
+        self.directories.update(str(folder) for folder in (parent, *parent.parents))
+        if is_directory:
+            self.directories.add(relative_path)
+            return
+
+        self.files.add(relative_path)
+        if relative_path in self.transcription_names:
+            # Transcriptions are small compared to the samples, they are kept in memory for the plugins
+            with open_member() as file:
+                self.texts[relative_path] = file.read()
+        elif str(parent) == self.dir_name and relative_path.endswith('.wav'):
+            with open_member() as file:
+                self.headers[relative_path] = scan(cast(BinaryIO, file), size)
+
+    def exists(self, relative_path: str) -> bool:
+        normalized_path = posixpath.normpath(relative_path)
+        return normalized_path in self.files or normalized_path in self.directories
+
+    def list_directory(self, dir_name: str) -> List[str]:
+        folder = PurePosixPath(dir_name)
+        return [
+            PurePosixPath(path).name for path in sorted(self.files | self.directories)
+            if path != '.' and PurePosixPath(path).parent == folder
+        ]
+
+    def has_text(self, name: str) -> bool:
+        return str(PurePosixPath(name)) in self.texts
+
+    def open(self, name: str) -> BinaryIO:
+        return io.BytesIO(self.texts[str(PurePosixPath(name))])
+
+    def header(self, relative_path: str) -> WavHeader:
+        header = self.headers.get(str(PurePosixPath(relative_path)))
+        if header is None:
+            header = WavHeader()
+            header.set_error(NOT_A_WAV_FILE)
+        return header
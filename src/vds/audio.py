@@ -0,0 +1,184 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from vds import profiler
+from vds.cache import CacheKey, ProbeCache
+from vds.prefetch import IOLimits, prefetch
+from vds.riff import NOT_A_WAV_FILE, scan_file, WavHeader
+
+# Data chunks are hashed in blocks of this size, so memory use does not depend on the length of a file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class AudioRecord(NamedTuple):
+    path: str
+    header: WavHeader
+
+    @property
+    def error(self) -> Optional[int]:
+        return self.header.error
+
+    @property
+    def frames(self) -> int:
+        # Same frame count as wave.Wave_read.getnframes() (taken from the declared size of the data chunk)
+        data = self.header.data
+        frame_size = self.header.channels * ((self.header.bits_per_sample + 7) // 8)
+        if data is None or frame_size == 0:
+            return 0
+        return data.size // frame_size
+
+    @property
+    def duration_ms(self) -> int:
+        if self.header.sample_rate == 0:
+            return 0
+        return int((self.frames / float(self.header.sample_rate)) * 1000)
+
+
+def create_process_pool(jobs: int) -> Any:
+    # Pools are created from the scheduler and batch threads, a fork() of a process with running threads can copy
+    # a lock held by another thread and hang the worker. The workers are started by a fork server (or spawned),
+    # which has no other threads. The pool (with multiprocessing) is imported only by runs with more than one job.
+    import multiprocessing  # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context(start_method))
+
+
+class ProcessPools:
+    # Batch mode checks many datasets in one process, so the workers of --jobs are started once for all of them
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pools: Optional[Dict[int, Any]] = None
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self.lock:
+            self.pools = {}
+        try:
+            yield
+        finally:
+            with self.lock:
+                pools, self.pools = self.pools or {}, None
+            for pool in pools.values():
+                pool.shutdown()
+
+    def get(self, jobs: int) -> Optional[Any]:
+        # None outside of shared(), then every run creates (and closes) its own pool
+        with self.lock:
+            if self.pools is None:
+                return None
+            if jobs not in self.pools:
+                self.pools[jobs] = create_process_pool(jobs)
+            return self.pools[jobs]
+
+
+process_pools = ProcessPools()
+
+
+def probe_file(dataset_path: str, relative_path: str) -> AudioRecord:
+    try:
+        header = scan_file(Path(dataset_path).joinpath(relative_path))
+    except OSError:
+        header = WavHeader()
+        header.set_error(NOT_A_WAV_FILE)
+    return AudioRecord(relative_path, header)
+
+
+def probe_files(
+        dataset_path: str, relative_paths: Iterable[str], total: int, jobs: int = 1,
+        io_limits: IOLimits = IOLimits(),
+) -> List[AudioRecord]:
+    # Imported here, so runs which don't read WAV files (like transcription-only checks) start faster
+    from tqdm import tqdm  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    probe = partial(probe_file, dataset_path)
+    if io_limits.threads > 0:
+        # On network mounts reading a header is a wait for the server, threads keep many requests outstanding
+        records = prefetch(probe, relative_paths, io_limits.threads, io_limits.in_flight)
+        return list(tqdm(records, total=total, desc='AudioProbe...'))
+
+    if jobs <= 1:
+        return [probe(relative_path) for relative_path in tqdm(relative_paths, total=total, desc='AudioProbe...')]
+
+    # map() yields results in submission order, so the report is the same as for a serial run
+    shared_pool = process_pools.get(jobs)
+    with nullcontext(shared_pool) if shared_pool else create_process_pool(jobs) as executor:
+        records = executor.map(probe, relative_paths, chunksize=max(1, min(256, total // (jobs * 8))))
+        return list(tqdm(records, total=total, desc='AudioProbe...'))
+
+
+def probe_files_with_cache(
+        dataset_path: str, relative_paths: Sequence[str], cache: ProbeCache, jobs: int = 1,
+        io_limits: IOLimits = IOLimits(),
+) -> List[AudioRecord]:
+    records: List[Optional[AudioRecord]] = []
+    keys: List[Optional[CacheKey]] = []
+    changed_files: List[int] = []
+
+    # stat() of every file is a round trip too, so it is prefetched the same way as the headers
+    paths = (Path(dataset_path).joinpath(relative_path) for relative_path in relative_paths)
+    if io_limits.threads > 0:
+        cache_keys: Iterable[Optional[CacheKey]] = prefetch(cache.key, paths, io_limits.threads, io_limits.in_flight)
+    else:
+        cache_keys = map(cache.key, paths)
+
+    for index, (relative_path, key) in enumerate(zip(relative_paths, cache_keys)):
+        header = cache.get(relative_path, key)
+        keys.append(key)
+        records.append(None if header is None else AudioRecord(relative_path, header))
+        if header is None:
+            changed_files.append(index)
+
+    probed_records = probe_files(
+        dataset_path, (relative_paths[index] for index in changed_files), total=len(changed_files), jobs=jobs,
+        io_limits=io_limits,
+    )
+    for index, record in zip(changed_files, probed_records):
+        records[index] = record
+        cache.put(record.path, keys[index], record.header)
+
+    cache.save()
+    return [record for record in records if record is not None]
+
+
+def hash_data(dataset_path: str, record: AudioRecord) -> Tuple[AudioRecord, Optional[bytes]]:
+    # BLAKE2 digest of the samples only (the data chunk), so files differing only in metadata chunks are equal
+    import hashlib  # pylint: disable=import-outside-toplevel
+
+    data = record.header.data
+    if data is None:
+        return record, None
+
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(HASH_BLOCK_SIZE)
+    view = memoryview(buffer)
+    remaining = data.size
+    try:
+        with open(Path(dataset_path).joinpath(record.path), 'rb', buffering=0) as file:
+            file.seek(data.offset)
+            while remaining > 0:
+                read = file.readinto(view[:min(remaining, HASH_BLOCK_SIZE)])
+                if not read:
+                    break
+                digest.update(view[:read])
+                remaining -= read
+    except OSError:
+        return record, None
+    profiler.count(files=1)
+    return record, digest.digest()
+
+
+def hash_files(
+        dataset_path: str, records: Iterable[AudioRecord], jobs: int = 1, io_limits: IOLimits = IOLimits(),
+) -> Iterator[Tuple[AudioRecord, Optional[bytes]]]:
+    # hashlib releases the GIL while it hashes large blocks, so threads are enough
+    hash_record = partial(hash_data, dataset_path)
+    threads = io_limits.threads or (jobs if jobs > 1 else 0)
+    if threads > 0:
+        yield from prefetch(hash_record, records, threads, io_limits.in_flight)
+    else:
+        yield from map(hash_record, records)
@@ -0,0 +1,116 @@
+import glob
+import time
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from vds.api import archive_options, create_plugins, Options
+from vds.audio import process_pools
+from vds.findings import FindingWriter
+from vds.paths import is_pattern
+from vds.prefetch import prefetch
+from vds.scheduler import PluginScheduler
+
+
+class DatasetRun(NamedTuple):
+    path: str
+    # (plugin, failed dependency) in the order the plugins finished
+    plugins: List[Tuple[Any, Optional[str]]]
+    error: Optional[str]
+    seconds: float
+
+
+class DatasetSummary(NamedTuple):
+    path: str
+    status: str
+    errors: int
+    failed_plugins: Tuple[str, ...]
+    skipped_plugins: int
+    seconds: float
+
+    @classmethod
+    def from_run(cls, run: DatasetRun) -> 'DatasetSummary':
+        failed_plugins = tuple(sorted(
+            vds_plugin.info.id for vds_plugin, failed_dependency in run.plugins
+            if not failed_dependency and len(vds_plugin.findings) > 0
+        ))
+        errors = sum(len(vds_plugin.findings) for vds_plugin, failed_dependency in run.plugins if not failed_dependency)
+        return cls(
+            path=run.path,
+            status='error' if run.error else ('fail' if failed_plugins else 'ok'),
+            errors=errors,
+            failed_plugins=failed_plugins,
+            skipped_plugins=sum(1 for _, failed_dependency in run.plugins if failed_dependency),
+            seconds=run.seconds,
+        )
+
+
+def read_path_list(path: Path) -> List[str]:
+    # One dataset (or glob) per line, empty lines and comments (#) are skipped
+    lines = (line.strip() for line in path.read_text(encoding='UTF-8').splitlines())
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    # Globs (also recursive, with **) are expanded in sorted order, every dataset is checked once
+    paths: Dict[str, None] = {}
+    for pattern in patterns:
+        paths.update(dict.fromkeys(sorted(glob.glob(pattern, recursive=True)) if is_pattern(pattern) else [pattern]))
+    return list(paths)
+
+
+def run_dataset(
+        options: Options, plugin_modules: List[ModuleType], writer: Optional[FindingWriter], path: str,
+) -> DatasetRun:
+    start = time.perf_counter()
+    dataset_options = archive_options(options._replace(path=path))
+    modules = [
+        plugin_module for plugin_module in plugin_modules
+        if plugin_module.ValidDataSetPlugin.info.id not in dataset_options.disabled_plugins
+    ]
+
+    try:
+        plugins = create_plugins(dataset_options, modules, writer, batch=True)
+        results = list(PluginScheduler(plugins).run())
+    except Exception as error:  # pylint: disable=broad-except
+        # A broken dataset must not stop the check of the other datasets
+        return DatasetRun(path, [], f'{type(error).__name__}: {error}', time.perf_counter() - start)
+    return DatasetRun(path, results, None, time.perf_counter() - start)
+
+
+def run_datasets(
+        options: Options, plugin_modules: List[ModuleType], paths: List[str], writer: Optional[FindingWriter],
+        concurrency: int,
+) -> Iterator[DatasetRun]:
+    # Datasets are checked concurrently by threads of one process: the interpreter, the imports, the plugin modules
+    # and the process pools of --jobs are loaded once for all of them. Runs are yielded in the order of paths.
+    with process_pools.shared():
+        yield from prefetch(partial(run_dataset, options, plugin_modules, writer), paths, max(1, concurrency))
+
+
+def print_summary(summaries: List[DatasetSummary], stream: TextIO) -> None:
+    from rich.console import Console  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+    from rich.table import Table  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+
+    failed = sum(1 for summary in summaries if summary.status != 'ok')
+    table = Table(title=f'Datasets: {len(summaries)} checked, {failed} with errors')
+
+    table.add_column('Dataset', justify='left', style='cyan', no_wrap=True)
+    table.add_column('Status', justify='center', no_wrap=True)
+    table.add_column('Errors', justify='right', no_wrap=True)
+    table.add_column('Failed plugins', justify='left')
+    table.add_column('Skipped', justify='right', no_wrap=True)
+    table.add_column('Time [s]', justify='right', no_wrap=True)
+
+    styles = {'ok': 'green', 'fail': 'red', 'error': 'bold red'}
+    for summary in summaries:
+        table.add_row(
+            summary.path,
+            f'[{styles[summary.status]}]{summary.status.upper()}[/]',
+            str(summary.errors),
+            ', '.join(summary.failed_plugins),
+            str(summary.skipped_plugins),
+            f'{summary.seconds:.2f}',
+        )
+    Console(file=stream).print(table)
@@ -0,0 +1,101 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from vds.riff import Chunk, WavHeader
+
+CACHE_FILE_NAME = '.vds-cache'
+# Increase when the scanner starts to report something different for the same file
+CACHE_VERSION = 1
+
+CacheKey = Tuple[int, int]
+
+
+def header_to_list(header: WavHeader) -> List[Any]:
+    chunks = [[chunk.id.decode('latin-1'), chunk.offset, chunk.size] for chunk in header.chunks]
+    return [
+        header.format_tag, header.channels, header.sample_rate, header.byte_rate, header.block_align,
+        header.bits_per_sample, header.big_endian, chunks, header.error,
+    ]
+
+
+def list_to_header(values: List[Any]) -> WavHeader:
+    header = WavHeader()
+    (
+        header.format_tag, header.channels, header.sample_rate, header.byte_rate, header.block_align,
+        header.bits_per_sample, header.big_endian, chunks, header.error,
+    ) = values
+    header.chunks = [Chunk(chunk_id.encode('latin-1'), offset, size) for chunk_id, offset, size in chunks]
+    return header
+
+
+class ProbeCache:
+    def __init__(self, path: Path, rebuild: bool = False) -> None:
+        self.path = path
+        self.entries: Dict[str, List[Any]] = {}
+        self.current_entries: Dict[str, List[Any]] = {}
+        self.changed = False
+        if rebuild:
+            self.clear()
+        else:
+            self.entries = self.load()
+
+    def load(self) -> Dict[str, List[Any]]:
+        try:
+            content = json.loads(self.path.read_text(encoding='UTF-8'))
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(content, dict) or content.get('version') != CACHE_VERSION:
+            return {}
+        return dict(content.get('files', {}))
+
+    def clear(self) -> None:
+        self.entries = {}
+        self.changed = True
+
+    @staticmethod
+    def key(path: Path) -> Optional[CacheKey]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, relative_path: str, key: Optional[CacheKey]) -> Optional[WavHeader]:
+        entry = self.entries.get(relative_path)
+        if key is None or entry is None or tuple(entry[:2]) != key:
+            return None
+
+        self.current_entries[relative_path] = entry
+        try:
+            return list_to_header(entry[2])
+        except (TypeError, ValueError):
+            return None
+
+    def put(self, relative_path: str, key: Optional[CacheKey], header: WavHeader) -> None:
+        if key is None:
+            return
+        self.current_entries[relative_path] = [key[0], key[1], header_to_list(header)]
+        self.changed = True
+
+    def save(self) -> None:
+        # Entries of removed files are dropped, because only files seen in this run are written
+        if self.changed or len(self.current_entries) != len(self.entries):
+            self.write()
+
+        # A cache kept in memory (vds serve) starts the next run from the entries of this one
+        self.entries, self.current_entries, self.changed = self.current_entries, {}, False
+
+    def write(self) -> None:
+        temporary_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            temporary_path.write_text(
+                json.dumps({'version': CACHE_VERSION, 'files': self.current_entries}, separators=(',', ':')),
+                encoding='UTF-8',
+            )
+            os.replace(temporary_path, self.path)
+        except OSError:
+            # Read-only datasets are still validated, just without the cache
+            temporary_path.unlink(missing_ok=True)
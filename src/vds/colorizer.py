@@ -1,5 +1,5 @@
 import re
-from pathlib import Path
+from typing import Dict, List
 
 from colorama import Fore, Style
 
@@ -42,39 +42,58 @@ class Tags:
 
 
 class Colorizer:
+    # Tags are recognised only before the first pipe, "wavs", pipes and path separators are highlighted everywhere
+    tags: Dict[str, Dict[str, str]] = Tags().__dict__
+    tokens = re.compile(
+        r'<(?P<tag>{tags})>(?P<content>[^|\n]*?)<(?P=tag)-end>|(?P<highlight>wavs|/|\\)'.format(
+            tags='|'.join(re.escape(tag) for tag in tags),
+        ),
+    )
+    highlights = re.compile(r'\||wavs|/|\\')
 
-    def colorize(self, text: str) -> str:
-        colorized_text = ''
+    def __init__(self, colors: bool = True) -> None:
+        self.colors = colors
+        self.tag_styles = {tag: f'{value["color"]}{value["style"]}' for tag, value in self.tags.items()}
+        self.replacements = {
+            '|': f'{Fore.YELLOW}{Style.BRIGHT}|{Style.RESET_ALL}',
+            'wavs': f'{Fore.LIGHTYELLOW_EX}{Style.DIM}wavs{Style.RESET_ALL}',
+            '/': f'{Fore.RED}{Style.BRIGHT}/{Style.RESET_ALL}',
+            '\\': f'{Fore.RED}{Style.BRIGHT}\\{Style.RESET_ALL}',
+        }
 
-        tags = Tags()
-        full_line = ''
-        for line in text.split('\n'):
-            result = line
-            piped_line = result.split('|')
-            result = piped_line[0]
+    def colorize_tags(self, text: str, parts: List[str]) -> None:
+        position = 0
+
+        for match in self.tokens.finditer(text):
+            parts.append(text[position:match.start()])
+            position = match.end()
 
-            for tag, value in tags.__dict__.items():
-                regex = r'{begin}(.*?){end}'.format(begin=f'<{tag}>', end=f'<{tag}-end>')
-                for match in re.findall(regex, result):
-                    result = result.replace(
-                        f'<{tag}>{match}<{tag}-end>',
-                        f'{value["color"]}{value["style"]}{match}{Style.RESET_ALL}',
-                    )
+            if match.group('tag') is None:
+                parts.append(self.replacements[match.group()])
+            else:
+                parts.append(self.tag_styles[match.group('tag')])
+                self.colorize_tags(match.group('content'), parts)
+                parts.append(Style.RESET_ALL)
 
-            full_line += f'{Fore.YELLOW}{Style.BRIGHT}|{Style.RESET_ALL}'.join([result] + piped_line[1:]) + '\n'
+        parts.append(text[position:])
 
-        colorized_text = full_line.replace('wavs', f'{Fore.LIGHTYELLOW_EX}{Style.DIM}wavs{Style.RESET_ALL}')
-        colorized_text = colorized_text.replace('/', f'{Fore.RED}{Style.BRIGHT}/{Style.RESET_ALL}')
-        colorized_text = colorized_text.replace('\\', f'{Fore.RED}{Style.BRIGHT}\\{Style.RESET_ALL}')
-        return colorized_text
+    def strip_tags(self, text: str) -> str:
+        return self.tokens.sub(
+            lambda match: match.group() if match.group('tag') is None else self.strip_tags(match.group('content')),
+            text,
+        )
 
-    @staticmethod
-    def clean_file(path: Path) -> None:
-        with open(path, 'r') as f:
-            content = f.read()
+    def colorize(self, text: str) -> str:
+        parts: List[str] = []
+
+        for line in text.split('\n'):
+            head, pipe, transcription = line.partition('|')
 
-        ansi_escape = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-        clean_text = ansi_escape.sub('', content)
+            if self.colors:
+                self.colorize_tags(head, parts)
+                parts.append(self.highlights.sub(lambda match: self.replacements[match.group()], pipe + transcription))
+            else:
+                parts.extend((self.strip_tags(head), pipe, transcription))
+            parts.append('\n')
 
-        with open(path, 'w') as f:
-            f.write(clean_text)
+        return ''.join(parts)
@@ -1,17 +1,26 @@
 import argparse
-from pathlib import Path
-from typing import List
+from typing import Protocol
+
+from vds.findings import Finding, Findings
 
 
 class Config:
+    # Arguments of the command line run only, the API (vds.api) keeps all options of a run in Options
     arguments: argparse.Namespace
-    disabled_plugins: str = ''
-    transcription_plugins_dir_path: Path = Path('transcription')
-    files_plugins_dir_path: Path = Path('files')
-    activate_plugins: List[str] = []
 
 
-class ValidDataSetPlugin:
-    # pass
-    def init_plugin(self) -> str:
-        return 'FAKE'
+class PluginInfo(Protocol):
+    id: str
+    name: str
+    cost: int
+
+
+class ValidDataSetPlugin(Protocol):
+    # What the report reads from a plugin, every plugins/*/*.py module defines a class with these attributes
+    info: PluginInfo
+    success_message: str
+    error_message: str
+    findings: Findings
+
+    def format_finding(self, finding: Finding) -> str:
+        ...
@@ -0,0 +1,295 @@
+import io
+import os
+import posixpath
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import (
+    BinaryIO, Collection, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Set, TextIO, Tuple,
+    TYPE_CHECKING,
+)
+
+from vds import profiler
+from vds.paths import normalize_path
+from vds.prefetch import IOLimits
+
+if TYPE_CHECKING:
+    from vds.archive import DatasetArchive
+    from vds.audio import AudioRecord
+    from vds.cache import ProbeCache
+
+READ_BUFFER_SIZE = 1024 * 1024
+LONE_CARRIAGE_RETURN = re.compile(rb'\r(?!\n)')
+
+
+class TranscriptionLine(NamedTuple):
+    line_number: int
+    line: str
+    wav_path: str
+    transcription: str
+
+
+class Transcription:
+    __slots__ = (
+        'name', 'path', 'archive', 'exists', 'number_of_lines', 'start_offset', 'first_line_number', 'line_offsets',
+        'size',
+    )
+
+    name: str
+    path: Path
+    archive: Optional['DatasetArchive']
+    exists: bool
+    number_of_lines: int
+    start_offset: int
+    first_line_number: int
+    line_offsets: 'array[int]'
+    size: int
+
+    def __init__(
+            self, name: str, path: Path, start_offset: int = 0, first_line_number: int = 1,
+            archive: Optional['DatasetArchive'] = None, known_line_offsets: Optional['array[int]'] = None,
+    ) -> None:
+        # With start_offset only the lines from this byte offset (the start of line first_line_number) are read,
+        # the watch mode uses it to check lines appended to the file. With archive the file is read from it.
+        # known_line_offsets (from the index of the file before lines were appended) are not read again.
+        self.name = name
+        self.path = path
+        self.archive = archive
+        self.start_offset = start_offset
+        self.first_line_number = first_line_number
+        self.exists = path.exists() if archive is None else archive.has_text(name)
+        self.size = start_offset
+        self.line_offsets = self.index_lines(known_line_offsets) if self.exists else array('Q')
+        self.number_of_lines = first_line_number - 1 + len(self.line_offsets) if self.exists else 0
+
+    def open_binary(self) -> BinaryIO:
+        if self.archive is None:
+            file: BinaryIO = open(self.path, 'rb', buffering=READ_BUFFER_SIZE)  # pylint: disable=consider-using-with
+        else:
+            file = self.archive.open(self.name)
+        file.seek(self.start_offset)
+        return file
+
+    def open(self) -> TextIO:
+        # Universal newlines, exactly like Path.read_text() used to split the files before
+        if self.start_offset == 0 and self.archive is None:
+            return open(self.path, 'r', encoding='UTF-8', buffering=READ_BUFFER_SIZE)
+        return io.TextIOWrapper(self.open_binary(), encoding='UTF-8')
+
+    def index_lines(self, known_line_offsets: Optional['array[int]'] = None) -> 'array[int]':
+        # Byte offset of every line start, 8 bytes per line whatever its length. Lines end with '\n', '\r\n' or a
+        # lone '\r' like in the universal newlines mode, so line() returns the same lines as the iteration.
+        line_offsets = array('Q', known_line_offsets or [self.start_offset])
+        offset = line_offsets[-1]
+        with self.open_binary() as file:
+            file.seek(offset)
+            for line in file:
+                if b'\r' in line:
+                    line_offsets.extend(offset + match.end() for match in LONE_CARRIAGE_RETURN.finditer(line))
+                offset += len(line)
+                if line.endswith(b'\n'):
+                    line_offsets.append(offset)
+        self.size = offset
+        return line_offsets
+
+    def appended(self, first_line_number: int) -> 'Transcription':
+        # The file after lines were appended to it, the file is read again from the start of first_line_number
+        # (the last line, which could have been incomplete). The lines before it keep their offsets.
+        known_line_offsets = self.line_offsets[:max(1, first_line_number - self.first_line_number + 1)]
+        return Transcription(
+            self.name, self.path, self.start_offset, self.first_line_number, self.archive, known_line_offsets,
+        )
+
+    def line(self, line_number: int) -> TranscriptionLine:
+        # Random access through the offset index, only the requested line is read and decoded
+        index = line_number - self.first_line_number
+        if not 0 <= index < len(self.line_offsets):
+            raise IndexError(f'{self.name} has no line {line_number}')
+
+        end = self.line_offsets[index + 1] if index + 1 < len(self.line_offsets) else self.size
+        with self.open_binary() as file:
+            file.seek(self.line_offsets[index])
+            text = file.read(end - self.line_offsets[index]).decode('UTF-8').rstrip('\r\n')
+        wav_path, _, transcription = text.partition('|')
+        return TranscriptionLine(line_number, text, wav_path, transcription)
+
+    def __len__(self) -> int:
+        return self.number_of_lines
+
+    def __iter__(self) -> Iterator[TranscriptionLine]:
+        # Lines are streamed from the file, so memory use does not depend on its size.
+        # Numbering is the same as for read_text().split('\n'), including the empty line after the last '\n'.
+        if not self.exists:
+            return
+
+        with self.open() as file:
+            line_number = self.first_line_number - 1
+            line = '\n'
+            for line_number, line in enumerate(file, start=self.first_line_number):
+                text = line[:-1] if line.endswith('\n') else line
+                wav_path, _, transcription = text.partition('|')
+                yield TranscriptionLine(line_number, text, wav_path, transcription)
+
+            if line.endswith('\n'):
+                yield TranscriptionLine(line_number + 1, '', '', '')
+            profiler.count(lines=line_number - self.first_line_number + 1)
+
+
+class Manifest(NamedTuple):
+    orphan_wav_files: Tuple[str, ...]
+    missing_wav_paths: FrozenSet[str]
+
+
+class DatasetIndex:
+    __slots__ = (
+        'path', 'dir_name', 'jobs', 'io_limits', 'cache', 'archive', 'transcriptions', 'directory_files', 'wav_files',
+        '_audio_records', '_audio_lock', '_manifest', '_manifest_lock',
+    )
+
+    path: str
+    dir_name: str
+    jobs: int
+    io_limits: IOLimits
+    cache: Optional['ProbeCache']
+    archive: Optional['DatasetArchive']
+    transcriptions: Tuple[Transcription, ...]
+    directory_files: FrozenSet[str]
+    wav_files: Tuple[str, ...]
+
+    def __init__(
+            self, path: str, files: List[str], dir_name: str, jobs: int = 1, cache: Optional['ProbeCache'] = None,
+            io_limits: IOLimits = IOLimits(), line_offsets: Optional[Dict[str, Tuple[int, int]]] = None,
+            wav_names: Optional[Collection[str]] = None, archive: Optional['DatasetArchive'] = None,
+            directory_files: Optional[Collection[str]] = None,
+    ) -> None:
+        # line_offsets (start offset and first line number for a file) and wav_names limit the index to a part of
+        # the dataset, the watch mode uses them to check only what has changed. With archive (path is the archive
+        # file) the dataset is read from the already indexed archive, nothing is extracted. directory_files is
+        # a known listing of the wavs folder, which is then not read again.
+        self.path = path
+        self.dir_name = dir_name
+        self.jobs = jobs
+        self.io_limits = io_limits
+        self.cache = cache
+        self.archive = archive
+        self.transcriptions = tuple(
+            Transcription(name, Path(path).joinpath(name), *(line_offsets or {}).get(name, (0, 1)), archive=archive)
+            for name in files
+        )
+
+        # Single listing of the wavs folder, used by every plugin instead of its own glob() or exists() calls
+        names = self.list_directory() if directory_files is None else list(directory_files)
+        self.directory_files = frozenset(names)
+        self.wav_files = tuple(
+            str(Path(self.dir_name, name)) for name in names
+            if name.endswith('.wav') and (wav_names is None or name in wav_names)
+        )
+
+        self._audio_records: Optional[Tuple['AudioRecord', ...]] = None
+        self._audio_lock = threading.Lock()
+        self._manifest: Optional[Manifest] = None
+        self._manifest_lock = threading.Lock()
+
+    def updated(self, line_offsets: Dict[str, Tuple[int, int]], wav_names: Collection[str]) -> 'DatasetIndex':
+        # The index after changes of the given files, the rest is taken from this one. Only the lines appended to
+        # the transcription files (from the first line number in line_offsets) and the changed WAV files are read.
+        changed_files = {name: self.exists(str(Path(self.dir_name, name))) for name in wav_names}
+        directory_files = {name for name in self.directory_files if changed_files.get(name, True)}
+        directory_files.update(name for name, exists in changed_files.items() if exists)
+        changed_paths = {str(Path(self.dir_name, name)): exists for name, exists in changed_files.items()}
+
+        index = DatasetIndex(
+            self.path, [], self.dir_name, self.jobs, self.cache, self.io_limits, archive=self.archive,
+            directory_files=(),
+        )
+        index.transcriptions = tuple(
+            transcription.appended(line_offsets[transcription.name][1])
+            if transcription.name in line_offsets else transcription
+            for transcription in self.transcriptions
+        )
+        index.directory_files = frozenset(directory_files)
+        # Files keep their place, new ones are added at the end
+        index.wav_files = tuple(path for path in self.wav_files if changed_paths.get(path, True)) + tuple(sorted(
+            str(Path(self.dir_name, name)) for name, exists in changed_files.items()
+            if exists and name.endswith('.wav') and name not in self.directory_files
+        ))
+
+        # Headers of the other files are kept, if any plugin has already read them
+        with self._audio_lock:
+            audio_records = self._audio_records
+        if audio_records is not None:
+            records = {record.path: record for record in audio_records if record.path not in changed_paths}
+            new_files = [path for path in index.wav_files if path not in records]
+            records.update(zip(new_files, index.read_audio_records(new_files)))
+            index._audio_records = tuple(records[path] for path in index.wav_files)
+        return index
+
+    def list_directory(self) -> List[str]:
+        if self.archive is not None:
+            return self.archive.list_directory(self.dir_name)
+        try:
+            with os.scandir(Path(self.path).joinpath(self.dir_name)) as entries:
+                return [entry.name for entry in entries]
+        except OSError:
+            return []
+
+    def wav_path_exists(self, wav_path: str) -> bool:
+        parent, name = posixpath.split(normalize_path(wav_path))
+        if (parent or '.') == normalize_path(self.dir_name):
+            return name in self.directory_files
+        # Paths outside of the wavs folder are rare, they are checked directly
+        return self.exists(wav_path)
+
+    def exists(self, relative_path: str) -> bool:
+        if self.archive is not None:
+            return self.archive.exists(relative_path)
+        return Path(f'{self.path}/{relative_path}').exists()
+
+    def manifest(self) -> Manifest:
+        # Hash join between the wavs folder listing and all paths used in the transcription files
+        with self._manifest_lock:
+            if self._manifest is None:
+                transcription_paths: Set[str] = set()
+                used_wav_paths: Dict[str, None] = {}
+
+                for transcription in self.transcriptions:
+                    for _, line, wav_path, _ in transcription:
+                        transcription_paths.add(normalize_path(wav_path))
+                        if line not in ('', '\n\n'):
+                            used_wav_paths[wav_path] = None
+
+                self._manifest = Manifest(
+                    orphan_wav_files=tuple(
+                        normalize_path(file) for file in self.wav_files
+                        if normalize_path(file) not in transcription_paths
+                    ),
+                    missing_wav_paths=frozenset(
+                        wav_path for wav_path in used_wav_paths if not self.wav_path_exists(wav_path)
+                    ),
+                )
+                # Only the plugin which builds the manifest checks the files, the others get it ready
+                profiler.count(files=len(self.wav_files))
+            return self._manifest
+
+    def audio_records(self) -> Tuple['AudioRecord', ...]:
+        # Every WAV file is opened once, no matter how many plugins use the result
+        with self._audio_lock:
+            if self._audio_records is None:
+                self._audio_records = self.read_audio_records(self.wav_files)
+                # Only the plugin which reads the headers checks the files, the others get them ready
+                profiler.count(files=len(self._audio_records))
+            return self._audio_records
+
+    def read_audio_records(self, wav_files: Sequence[str]) -> Tuple['AudioRecord', ...]:
+        # Runs which check only the transcriptions never import the probe
+        from vds import audio  # pylint: disable=import-outside-toplevel
+
+        if self.archive is not None:
+            # Headers were read together with the archive, in its single pass
+            return tuple(audio.AudioRecord(path, self.archive.header(path)) for path in wav_files)
+        if self.cache is not None:
+            return tuple(audio.probe_files_with_cache(self.path, wav_files, self.cache, self.jobs, self.io_limits))
+        return tuple(
+            audio.probe_files(self.path, wav_files, total=len(wav_files), jobs=self.jobs, io_limits=self.io_limits),
+        )
@@ -0,0 +1,161 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from types import MappingProxyType, TracebackType
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, TextIO, Type
+
+FORMATS = ('text', 'jsonl', 'sarif')
+WRITE_BUFFER_SIZE = 1024 * 1024
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+
+class Finding(NamedTuple):
+    plugin_id: str
+    message: str
+    file: Optional[str] = None
+    line_number: Optional[int] = None
+    wav_path: Optional[str] = None
+    line: Optional[str] = None
+    # Read-only, the default is shared by all findings without details
+    details: Mapping[str, Any] = MappingProxyType({})
+    level: str = 'error'
+
+    def to_dict(self) -> Dict[str, Any]:
+        # JSON-ready, details are copied into a plain dict
+        return {**self._asdict(), 'details': dict(self.details)}
+
+
+class FindingWriter:
+    # Base writer, findings of all plugins go through one instance, so writes are guarded by a lock
+    def __init__(self, output: Optional[Path]) -> None:
+        self.lock = threading.Lock()
+        self.file: Optional[TextIO] = None
+        if output:
+            self.file = open(output, 'w', encoding='UTF-8', buffering=WRITE_BUFFER_SIZE)
+        self.stream: TextIO = self.file or sys.stdout
+
+    def open(self) -> None:
+        pass
+
+    def write(self, finding: Finding, dataset: Optional[str] = None) -> None:
+        # dataset is the path of the dataset in batch mode, where findings of many datasets go to one output
+        raise NotImplementedError
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+        else:
+            self.stream.flush()
+
+    def __enter__(self) -> 'FindingWriter':
+        self.open()
+        return self
+
+    def __exit__(
+            self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class JsonLinesWriter(FindingWriter):
+    def write(self, finding: Finding, dataset: Optional[str] = None) -> None:
+        record = finding.to_dict() if dataset is None else {'dataset': dataset, **finding.to_dict()}
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(f'{line}\n')
+
+
+class SarifWriter(FindingWriter):
+    # The envelope is written up front and the results array is left open, so results are streamed one by one
+    def __init__(self, output: Optional[Path], plugin_infos: List[Any]) -> None:
+        super().__init__(output)
+        self.plugin_infos = plugin_infos
+        self.first_result = True
+
+    def open(self) -> None:
+        rules = [
+            {'id': info.id, 'name': info.name, 'shortDescription': {'text': info.description}}
+            for info in self.plugin_infos
+        ]
+        driver = {'name': 'ValidDataSet', 'informationUri': 'https://github.com/8tm/ValidDataSet', 'rules': rules}
+        header = json.dumps({'$schema': SARIF_SCHEMA, 'version': SARIF_VERSION, 'runs': [{'tool': {'driver': driver}}]})
+        # Cut the closing brackets of the last run, they are added again in close()
+        self.stream.write(f'{header[:-3]},"results":[\n')
+
+    def write(self, finding: Finding, dataset: Optional[str] = None) -> None:
+        result: Dict[str, Any] = {
+            'ruleId': finding.plugin_id,
+            'level': finding.level,
+            'message': {'text': finding.message},
+        }
+        uri = finding.file or finding.wav_path
+        if uri:
+            location: Dict[str, Any] = {'artifactLocation': {'uri': uri}}
+            if finding.line_number is not None:
+                location['region'] = {'startLine': finding.line_number}
+            result['locations'] = [{'physicalLocation': location}]
+
+        properties = dict(finding.details)
+        if finding.file and finding.wav_path:
+            properties['wav_path'] = finding.wav_path
+        if dataset is not None:
+            properties['dataset'] = dataset
+        if properties:
+            result['properties'] = properties
+
+        line = json.dumps(result, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line if self.first_result else f',\n{line}')
+            self.first_result = False
+
+    def close(self) -> None:
+        self.stream.write('\n]}]}\n')
+        super().close()
+
+
+def create_writer(output_format: str, output: Optional[Path], plugin_infos: List[Any]) -> Optional[FindingWriter]:
+    if output_format == 'jsonl':
+        return JsonLinesWriter(output)
+    if output_format == 'sarif':
+        return SarifWriter(output, plugin_infos)
+    return None
+
+
+class Findings:
+    # Sink of a single plugin: counts every finding, but keeps (or streams to the writer) only the first examples.
+    # Records are formatted by the plugin when the report is printed, so nothing is rendered for dropped findings.
+    def __init__(
+            self, writer: Optional[FindingWriter] = None, max_examples: Optional[int] = None,
+            dataset: Optional[str] = None,
+    ) -> None:
+        self.writer = writer
+        self.max_examples = max_examples
+        self.dataset = dataset
+        self.examples: List[Finding] = []
+        self.count = 0
+
+    def add(self, finding: Finding) -> None:
+        self.count += 1
+        if self.max_examples is not None and self.count > self.max_examples:
+            return
+
+        if self.writer is None:
+            self.examples.append(finding)
+        else:
+            self.writer.write(finding, self.dataset)
+
+    @property
+    def omitted(self) -> int:
+        if self.max_examples is None:
+            return 0
+        return max(0, self.count - self.max_examples)
+
+    def __iter__(self) -> Iterator[Finding]:
+        return iter(self.examples)
+
+    def __len__(self) -> int:
+        return self.count
@@ -1,20 +1,40 @@
 import argparse
-import importlib.util
 import os
 import sys
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List
+from types import ModuleType
+from typing import List, Optional, TextIO, TYPE_CHECKING
 
 from colorama import Fore, Style
-from rich.console import Console  # type: ignore  # pylint: disable=import-error
-from rich.table import Table  # type: ignore  # pylint: disable=import-error
 
 from vds.config import Config, ValidDataSetPlugin  # type: ignore
 from vds.colorizer import Colorizer  # type: ignore
+from vds.findings import create_writer, Finding, FindingWriter, FORMATS  # type: ignore
+from vds.paths import is_archive, is_pattern  # type: ignore
+from vds.registry import list_plugin_metadata, load_plugin_modules  # type: ignore
+from vds.report import Report  # type: ignore
+
+if TYPE_CHECKING:
+    from vds.api import Options
+    from vds.dataset import DatasetIndex
+
+
+def help_formatter(prog: str) -> argparse.HelpFormatter:
+    # argparse asks shutil (which imports bz2 and lzma) for the width of the terminal for every added argument,
+    # the width is read here the same way, but without the import
+    try:
+        width = int(os.environ.get('COLUMNS', '0')) or os.get_terminal_size().columns
+    except (ValueError, OSError):
+        width = 80
+    return argparse.HelpFormatter(prog, width=width - 2)
 
 
 def parser() -> argparse.ArgumentParser:
-    argument_parser = argparse.ArgumentParser(description='Validate audio and text files.')
+    argument_parser = argparse.ArgumentParser(
+        description='Validate audio and text files.', formatter_class=help_formatter,
+    )
 
     # ARGS menu:
     argument_parser.add_argument(
@@ -27,7 +47,11 @@ def parser() -> argparse.ArgumentParser:
     )
     argument_parser.add_argument(
         '--args.path', type=str, action='store', required=False, default='',
-        dest='args_path', help='Path to dataset',
+        dest='args_path', help='Path to dataset (a folder or a .tar, .tar.gz, .tar.bz2, .tar.xz or .zip archive)',
+    )
+    argument_parser.add_argument(
+        '--args.path-list', type=Path, action='store', required=False, default=None,
+        dest='args_path_list', help='File with paths (or globs) of datasets to check in one run, one per line',
     )
     argument_parser.add_argument(
         '--args.sample-rate', type=int, action='store', required=False, default=22050,
@@ -56,150 +80,398 @@ def parser() -> argparse.ArgumentParser:
         dest='plugins_disable', help='Disable plugins',
     )
 
+    argument_parser.add_argument(
+        '--plugins.enable', type=str, action='store', required=False, default='',
+        dest='plugins_enable', help='Enable opt-in plugins (like the slow F004)',
+    )
+
     argument_parser.add_argument(
         '--plugins.list', action='store_true',
         dest='plugins_list', help='List plugins',
     )
 
-    # MAIN menu:
+    # CACHE menu:
     argument_parser.add_argument(
-        '-o', '--output', type=Path, action='store', required=False, default=None,
-        help='Save output to file',
+        '--cache.disable', action='store_true',
+        dest='cache_disable', help='Do not read or write the cache of WAV file properties',
     )
 
     argument_parser.add_argument(
-        '-v', '--verbose', action='store_true', required=False, default=False,
-        help='Print additional information',
+        '--cache.rebuild', action='store_true',
+        dest='cache_rebuild', help='Ignore the cache of WAV file properties and create it again',
     )
-    return argument_parser
 
+    # PROFILE menu:
+    argument_parser.add_argument(
+        '--profile', action='store_true',
+        dest='profile', help='Print time, CPU time, throughput, bytes read, opened files and memory of every plugin',
+    )
 
-def list_plugins() -> None:
-    plugin_modules = get_plugins()
+    argument_parser.add_argument(
+        '--profile.json', type=Path, action='store', required=False, default=None,
+        dest='profile_json', help='Save the profile of every plugin to a JSON file',
+    )
 
-    table = Table(title='Plugins')
+    argument_parser.add_argument(
+        '--profile.cprofile', type=Path, action='store', required=False, default=None,
+        dest='profile_cprofile', help='Save cProfile stats of every plugin to <folder>/<plugin id>.prof '
+                                      '(plugins run one by one)',
+    )
 
-    table.add_column('ID', justify='center', style='cyan', no_wrap=True)
-    table.add_column('Name', justify='left', style='magenta', no_wrap=True)
-    table.add_column('Version', justify='center', style='yellow', no_wrap=True)
-    table.add_column('Description', justify='left', style='green', no_wrap=True)
+    # STATS menu:
+    argument_parser.add_argument(
+        '--stats', action='store_true',
+        dest='stats', help='Print hours, duration histogram and text statistics of the dataset instead of checking it',
+    )
 
-    for valid_dataset_plugin in plugin_modules:
-        vds_plugin = valid_dataset_plugin.init_plugin()
-        table.add_row(vds_plugin.info.id, vds_plugin.info.name, vds_plugin.info.version, vds_plugin.info.description)
-    console = Console()
-    console.print(table)
-    print()
+    argument_parser.add_argument(
+        '--stats.json', type=Path, action='store', required=False, default=None,
+        dest='stats_json', help='Save statistics of the dataset to a JSON file instead of checking it',
+    )
 
+    # IO menu:
+    argument_parser.add_argument(
+        '--io.threads', type=int, action='store', required=False, default=0,
+        dest='io_threads', help='Number of threads reading WAV files instead of --jobs processes (for NFS or FUSE)',
+    )
 
-def get_plugins() -> List[ValidDataSetPlugin]:
-    Config.disabled_plugins = [f'{file.lower()}.py' for file in Config.arguments.plugins_disable.split(',')]
+    argument_parser.add_argument(
+        '--io.in-flight', type=int, action='store', required=False, default=0,
+        dest='io_in_flight', help='Maximal number of WAV files read ahead of the plugins (default: 4 per thread)',
+    )
 
-    Config.transcription_plugins_dir_path = str(
-        Path(__file__).parent / 'plugins' / Config.transcription_plugins_dir_path,
+    # BATCH menu:
+    argument_parser.add_argument(
+        '--batch.jobs', type=int, action='store', required=False, default=4,
+        dest='batch_jobs', help='Number of datasets checked at once with --args.path-list or a glob in --args.path',
     )
-    Config.files_plugins_dir_path = str(
-        Path(__file__).parent / 'plugins' / Config.files_plugins_dir_path,
+
+    # WATCH menu:
+    argument_parser.add_argument(
+        '--watch', action='store_true',
+        dest='watch', help='Check the dataset again after every change and print only new and resolved errors',
     )
 
-    Config.activate_plugins = [
-        file for file in (
-            os.listdir(Path(__file__).parent / 'plugins' / Config.transcription_plugins_dir_path)
-            + os.listdir(Path(__file__).parent / 'plugins' / Config.files_plugins_dir_path)
-        ) if file.endswith('.py') and file not in Config.disabled_plugins
-    ]
+    argument_parser.add_argument(
+        '--watch.interval', type=float, action='store', required=False, default=1.0,
+        dest='watch_interval', help='Seconds between checks of files when inotify is not available',
+    )
 
-    plugin_modules = []
+    # FIX menu:
+    argument_parser.add_argument(
+        '--fix', action='store_true',
+        dest='fix', help='After the check remove metadata from WAV files (F003) and empty and repeated lines from '
+                         'transcription files (T002), files are rewritten in place',
+    )
 
-    for plugin_file in sorted(Config.activate_plugins):
-        module_name: str = str(os.path.splitext(plugin_file)[0])
-        module_path: str = ''
-        if 't' in plugin_file:
-            module_path = str(Path(Config.transcription_plugins_dir_path) / str(plugin_file))
-        elif 'f' in plugin_file:
-            module_path = str(Path(Config.files_plugins_dir_path) / str(plugin_file))
+    # MAIN menu:
+    argument_parser.add_argument(
+        '-o', '--output', type=Path, action='store', required=False, default=None,
+        help='Save output to file',
+    )
 
-        spec = importlib.util.spec_from_file_location(str(module_name), module_path)
-        if spec is None:
-            continue
-        plugin_module = importlib.util.module_from_spec(spec)
-        if spec.loader is not None:
-            spec.loader.exec_module(plugin_module)
-        plugin_modules.append(plugin_module)
-    return plugin_modules
+    argument_parser.add_argument(
+        '-f', '--format', type=str, action='store', required=False, default='text', choices=FORMATS,
+        help='Output format, findings in jsonl and sarif formats are written as soon as they are found',
+    )
 
+    argument_parser.add_argument(
+        '--max-errors', type=int, action='store', required=False, default=None,
+        dest='max_errors', help='Number of errors shown for each plugin, all errors are still counted',
+    )
 
-def add_text_to_file(path: Path, text: str) -> None:
-    with open(path, 'a', encoding='UTF-8') as file:
-        file.write(text)
+    argument_parser.add_argument(
+        '-j', '--jobs', type=int, action='store', required=False, default=1,
+        help='Number of processes used to check WAV files',
+    )
 
+    argument_parser.add_argument(
+        '--no-color', action='store_true', required=False, default=False,
+        dest='no_color', help='Do not use colors in the terminal output',
+    )
+
+    argument_parser.add_argument(
+        '-v', '--verbose', action='store_true', required=False, default=False,
+        help='Print additional information',
+    )
+    return argument_parser
+
+
+def list_plugins() -> None:
+    # A plain table: rich takes longer to import than everything else --plugins.list does
+    columns = ('ID', 'Name', 'Version', 'Description')
+    rows = [
+        (info.id, info.name, info.version, f'{info.description} [opt-in]' if info.opt_in else info.description)
+        for info in list_plugin_metadata(Config.arguments.plugins_disable.split(','))
+    ]
+    widths = [max(len(row[column]) for row in [columns, *rows]) for column in range(len(columns))]
 
-def present_plugin_output(vds_plugin: ValidDataSetPlugin, colorizer: Colorizer) -> None:
+    print(f'{"Plugins":^{sum(widths) + 3 * (len(columns) - 1)}}'.rstrip())
+    for row in [columns, tuple('-' * width for width in widths), *rows]:
+        print(' | '.join(f'{value:<{width}}' for value, width in zip(row, widths)).rstrip())
+    print()
+
+
+def present_plugin_output(vds_plugin: ValidDataSetPlugin, report: Report) -> None:
     _status_ok = f'{Fore.GREEN}{Style.BRIGHT} OK {Style.RESET_ALL}'
     _status_fail = f'{Fore.RED}{Style.BRIGHT}FAIL{Style.RESET_ALL}'
     colored_id = f'{Fore.LIGHTRED_EX}{Style.BRIGHT}{vds_plugin.info.id}{Style.RESET_ALL}'
 
-    if len(vds_plugin.errors) == 0 and Config.arguments.verbose:
-        line = f'{colored_id}: [{_status_ok}] {vds_plugin.success_message}\n'
+    if len(vds_plugin.findings) == 0 and Config.arguments.verbose:
+        report.line(f'{colored_id}: [{_status_ok}] {vds_plugin.success_message}\n')
 
-        if Config.arguments.output:
-            add_text_to_file(Config.arguments.output, line)
+    if len(vds_plugin.findings) > 0:
+        bright_error_message = f'{Fore.WHITE}{Style.NORMAL}{vds_plugin.error_message}{Style.RESET_ALL}'
+        report.line(
+            f'{colored_id}: [{_status_fail}] {bright_error_message.format(nof=str(len(vds_plugin.findings)))}\n',
+        )
 
-        print(line)
+        # Empty for the jsonl and sarif formats, their findings were already written by the plugin
+        for finding in vds_plugin.findings:
+            report.finding(vds_plugin.format_finding(finding))
 
-    if len(vds_plugin.errors) > 0:
-        bright_error_message = f'{Fore.WHITE}{Style.NORMAL}{vds_plugin.error_message}{Style.RESET_ALL}'
-        line = f'{colored_id}: [{_status_fail}] {bright_error_message.format(nof=str(len(vds_plugin.errors)))}\n'
+        if vds_plugin.findings.omitted > 0:
+            report.line(f'... and {vds_plugin.findings.omitted} more (see --max-errors)\n')
+        print(file=report.stream)
+
+
+def present_skipped_plugin(vds_plugin: ValidDataSetPlugin, failed_dependency: str, report: Report) -> None:
+    _status_skip = f'{Fore.YELLOW}{Style.BRIGHT}SKIP{Style.RESET_ALL}'
+    colored_id = f'{Fore.LIGHTRED_EX}{Style.BRIGHT}{vds_plugin.info.id}{Style.RESET_ALL}'
+    report.line(f'{colored_id}: [{_status_skip}] Skipped because {failed_dependency} failed\n')
+
+
+def present_changes(
+        vds_plugin: ValidDataSetPlugin, new: List[Finding], resolved: List[Finding], report: Report, first: bool,
+) -> None:
+    # The first run of --watch prints all errors like a normal run, next runs print only what has changed
+    _status_ok = f'{Fore.GREEN}{Style.BRIGHT} OK {Style.RESET_ALL}'
+    _status_new = f'{Fore.RED}{Style.BRIGHT}{"FAIL" if first else "NEW "}{Style.RESET_ALL}'
+    _status_resolved = f'{Fore.GREEN}{Style.BRIGHT}GONE{Style.RESET_ALL}'
+    colored_id = f'{Fore.LIGHTRED_EX}{Style.BRIGHT}{vds_plugin.info.id}{Style.RESET_ALL}'
+    max_errors = Config.arguments.max_errors
 
-        if Config.arguments.output:
-            add_text_to_file(Config.arguments.output, line)
+    if first and not new and Config.arguments.verbose:
+        report.line(f'{colored_id}: [{_status_ok}] {vds_plugin.success_message}\n')
 
-        print(line)
+    new_message = vds_plugin.error_message.format(nof=len(new)) if first else f'New errors: {len(new)}'
+    for status, message, findings in (
+            (_status_new, new_message, new), (_status_resolved, f'Resolved errors: {len(resolved)}', resolved),
+    ):
+        if not findings:
+            continue
 
-        for error in vds_plugin.errors:
+        report.line(f'{colored_id}: [{status}] {Fore.WHITE}{Style.NORMAL}{message}{Style.RESET_ALL}\n')
+        for finding in findings[:max_errors]:
+            report.finding(vds_plugin.format_finding(finding))
+        if max_errors is not None and len(findings) > max_errors:
+            report.line(f'... and {len(findings) - max_errors} more (see --max-errors)\n')
+        print(file=report.stream)
+
+
+def show_stats(options: 'Options') -> None:
+    # Only WAV headers and transcriptions are read, just like for the checks, but no plugin is run
+    from vds.api import create_dataset  # type: ignore  # pylint: disable=import-outside-toplevel
+    from vds.stats import DatasetStats  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    dataset_stats = DatasetStats(create_dataset(options))
+    if Config.arguments.stats:
+        dataset_stats.print_tables(sys.stdout)
+    if Config.arguments.stats_json:
+        dataset_stats.save(Config.arguments.stats_json)
+
+
+def watch(options: 'Options', plugin_modules: List[ModuleType], report: Report) -> None:
+    # Imported only here, nothing else needs ctypes or select
+    from vds.cache import CACHE_FILE_NAME, ProbeCache  # type: ignore  # pylint: disable=import-outside-toplevel
+    from vds.watch import create_watcher, WatchSession  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    probe_cache = None
+    if options.cache:
+        probe_cache = ProbeCache(Path(options.path) / CACHE_FILE_NAME, rebuild=options.rebuild_cache)
+
+    session = WatchSession(options, plugin_modules, probe_cache)
+    watcher = create_watcher(Path(options.path), options.dir_name, options.files, Config.arguments.watch_interval)
+    changes = None
+
+    try:
+        while True:
+            for vds_plugin, new, resolved, failed_dependency in session.run(changes):
+                if failed_dependency:
+                    present_skipped_plugin(vds_plugin, failed_dependency, report)
+                else:
+                    present_changes(vds_plugin, new, resolved, report, first=changes is None)
+
+            report.line(f'{time.strftime("%H:%M:%S")} Watching for changes, {session.total} errors in the dataset\n')
+            report.flush()
+            changes = watcher.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def batch_paths(argument_parser: argparse.ArgumentParser) -> Optional[List[str]]:
+    # Many datasets are checked in one run when they are listed in a file or matched by a glob in --args.path
+    arguments = Config.arguments
+    if arguments.args_path_list is None and not is_pattern(arguments.args_path):
+        return None
+    unsupported = (
+        arguments.watch, arguments.stats, arguments.stats_json, arguments.profile, arguments.profile_json,
+        arguments.profile_cprofile, arguments.fix,
+    )
+    if any(unsupported):
+        argument_parser.error('checking many datasets does not support --watch, --stats, --profile and --fix')
+
+    from vds import batch as batch_mode  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    patterns = batch_mode.read_path_list(arguments.args_path_list) if arguments.args_path_list else []
+    paths: List[str] = batch_mode.expand_paths(patterns + ([arguments.args_path] if arguments.args_path else []))
+    if not paths:
+        argument_parser.error('no dataset matches --args.path or --args.path-list')
+    return paths
+
+
+def batch(
+        options: 'Options', paths: List[str], plugin_modules: List[ModuleType], colorizer: Colorizer,
+        status_stream: TextIO,
+) -> None:
+    from vds import batch as batch_mode  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    structured_output = Config.arguments.format != 'text'
+    writer = finding_writer(options)
+    _status_error = f'{Fore.RED}{Style.BRIGHT}ERROR{Style.RESET_ALL}'
+    summaries = []
+
+    report_output = None if structured_output else Config.arguments.output
+    with Report(report_output, colorizer, status_stream) as report, writer or nullcontext():
+        for run in batch_mode.run_datasets(options, plugin_modules, paths, writer, Config.arguments.batch_jobs):
+            # Every dataset is printed as soon as it and all datasets before it are checked
+            report.line(f'{Style.BRIGHT}Dataset: {run.path}{Style.RESET_ALL}\n')
+            if run.error:
+                report.line(f'[{_status_error}] {run.error}\n')
+            for vds_plugin, failed_dependency in run.plugins:
+                if failed_dependency:
+                    present_skipped_plugin(vds_plugin, failed_dependency, report)
+                else:
+                    present_plugin_output(vds_plugin, report)
+            summaries.append(batch_mode.DatasetSummary.from_run(run))
+
+    batch_mode.print_summary(summaries, status_stream)
+
+
+def fix(options: 'Options', dataset: 'DatasetIndex', status_stream: TextIO) -> None:
+    # Reported files are rewritten after all plugins have finished, so every plugin checked the original files
+    from vds.repair import fix_dataset  # pylint: disable=import-outside-toplevel
+
+    summary = fix_dataset(dataset, threads=options.io_threads or options.jobs)
+    print(f'Fix: removed metadata from {len(summary.fixed_wav_files)} WAV files', file=status_stream)
+    for wav_file in summary.failed_wav_files:
+        print(f'Fix: {wav_file} was not rewritten (it is truncated, changed or read-only)', file=status_stream)
+    for transcription in summary.transcriptions:
+        print(
+            f'Fix: removed {transcription.empty_lines} empty and {transcription.duplicated_lines} repeated lines '
+            f'from {transcription.name}',
+            file=status_stream,
+        )
+    for name in summary.failed_transcriptions:
+        print(f'Fix: {name} was not rewritten (it or its folder is read-only)', file=status_stream)
+
+
+def finding_writer(options: 'Options') -> Optional[FindingWriter]:
+    # Metadata of the plugins (parsed from their sources) is needed only for the rules of the SARIF log
+    rules = [
+        info for info in list_plugin_metadata(options.disabled_plugins)
+        if not info.opt_in or info.id in options.enabled_plugins
+    ] if Config.arguments.format == 'sarif' else []
+    return create_writer(Config.arguments.format, Config.arguments.output, rules)
+
+
+def check(options: 'Options', plugin_modules: List[ModuleType], colorizer: Colorizer, status_stream: TextIO) -> None:
+    from vds.api import create_dataset, create_plugins  # type: ignore  # pylint: disable=import-outside-toplevel
+    from vds.scheduler import PluginScheduler  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    structured_output = Config.arguments.format != 'text'
+    writer = finding_writer(options)
+    dataset = create_dataset(options)
+    plugins = create_plugins(options, plugin_modules, writer, dataset=dataset)
+
+    profiler = None
+    if Config.arguments.profile or Config.arguments.profile_json or Config.arguments.profile_cprofile:
+        from vds.profiler import Profiler  # type: ignore  # pylint: disable=import-outside-toplevel
+        profiler = Profiler(Config.arguments.profile_cprofile)
+
+    scheduler = PluginScheduler(
+        plugins,
+        run_plugin=profiler.run if profiler else None,
+        # One profiler at a time can be active in a process
+        max_running=1 if Config.arguments.profile_cprofile else None,
+    )
 
-            if Config.arguments.output:
-                add_text_to_file(Config.arguments.output, colorizer.colorize(error))
+    report_output = None if structured_output else Config.arguments.output
+    with Report(report_output, colorizer, status_stream) as report, writer or nullcontext():
+        for vds_plugin, failed_dependency in scheduler.run():
+            if failed_dependency:
+                present_skipped_plugin(vds_plugin, failed_dependency, report)
+            else:
+                present_plugin_output(vds_plugin, report)
 
-            print(colorizer.colorize(error))
-        print()
+    if profiler and Config.arguments.profile:
+        profiler.print_table(status_stream)
+    if profiler and Config.arguments.profile_json:
+        profiler.save(Config.arguments.profile_json)
+    if Config.arguments.fix:
+        fix(options, dataset, status_stream)
 
 
 def main() -> None:
-    Config.arguments = parser().parse_args()
+    if sys.argv[1:2] == ['serve']:
+        from vds import server  # type: ignore  # pylint: disable=import-outside-toplevel
+        sys.exit(server.main(sys.argv[2:]))
+
+    argument_parser = parser()
+    Config.arguments = argument_parser.parse_args()
 
     if Config.arguments.plugins_list:
         list_plugins()
         sys.exit(0)
 
-    if Config.arguments.output and Path(Config.arguments.output).exists():
-        Path(Config.arguments.output).unlink()
+    # The API (with the dataset index, the cache and the scheduler) is imported only now, so --plugins.list and
+    # errors in the arguments don't wait for it
+    from vds.api import archive_options, Options  # type: ignore  # pylint: disable=import-outside-toplevel
 
-    colorizer = Colorizer()
+    options = archive_options(Options.from_arguments(Config.arguments))
+    paths = batch_paths(argument_parser)
 
-    plugin_modules = get_plugins()
+    if Config.arguments.fix and is_archive(options.path):
+        argument_parser.error('--fix does not support archives')
 
-    for valid_dataset_plugin in plugin_modules:
+    if Config.arguments.stats or Config.arguments.stats_json:
+        show_stats(options)
+        sys.exit(0)
 
-        vds_plugin = valid_dataset_plugin.init_plugin()
-        vds_plugin.args = {
-            'path': str(Config.arguments.args_path),
-            'files': list(path for path in str(Config.arguments.args_files).split(',')),
-            'dir_name': str(Config.arguments.args_dir_name),
-            'expected_properties': {
-                'sample_rate': Config.arguments.args_sample_rate,
-                'number_of_channels': Config.arguments.args_number_of_channels,
-                'min_duration': Config.arguments.args_min_duration,
-                'max_duration': Config.arguments.args_max_duration,
-                'number_of_pipes': Config.arguments.args_number_of_pipes,
-            },
-        }
+    # Findings in jsonl or sarif format go to stdout (or --output), so plugin statuses are printed to stderr
+    structured_output = Config.arguments.format != 'text'
+    status_stream = sys.stderr if structured_output else sys.stdout
+    colorizer = Colorizer(colors=status_stream.isatty() and not Config.arguments.no_color)
+    plugin_modules = load_plugin_modules(options.disabled_plugins, options.enabled_plugins)
 
-        vds_plugin.run()
-        present_plugin_output(vds_plugin, colorizer)
+    if paths is not None:
+        batch(options, paths, plugin_modules, colorizer, status_stream)
+        sys.exit(0)
+
+    if Config.arguments.watch:
+        if structured_output:
+            argument_parser.error('--watch supports only the text format')
+        if is_archive(options.path):
+            argument_parser.error('--watch does not support archives')
+        if Config.arguments.fix:
+            argument_parser.error('--watch does not support --fix')
+        with Report(Config.arguments.output, colorizer, status_stream) as report:
+            watch(options, plugin_modules, report)
+        sys.exit(0)
 
-    if Config.arguments.output:
-        colorizer.clean_file(Config.arguments.output)
+    check(options, plugin_modules, colorizer, status_stream)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,25 @@
+import os
+import re
+from pathlib import PurePosixPath
+
+# Only the standard os module is imported here: every run checks what --args.path is, but only runs which read an
+# archive need tarfile, zipfile and the decompressors (imported by vds.archive when the archive is opened)
+ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.zip')
+GLOB_CHARACTERS = ('*', '?', '[')
+# Empty path, "." components, repeated or trailing slashes: everything PurePosixPath would change in a relative path
+NOT_NORMALIZED_PATH = re.compile(r'^$|(^|/)\.(/|$)|//|/$')
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+def is_pattern(path: str) -> bool:
+    # A dataset which exists is never a glob, even when its name has glob characters (like speaker[1])
+    return any(character in path for character in GLOB_CHARACTERS) and not os.path.exists(path)
+
+
+def normalize_path(path: str) -> str:
+    # Same result as str(PurePosixPath(path)), but paths from the transcriptions and the wavs folder are nearly always
+    # normalized already, and PurePosixPath would be created for each of them by every join of the manifest
+    return path if NOT_NORMALIZED_PATH.search(path) is None else str(PurePosixPath(path))
@@ -1,8 +1,9 @@
-import wave
-from pathlib import Path
 from typing import Dict, List, Tuple, Union
 
-from tqdm import tqdm  # type: ignore
+from vds.audio import AudioRecord
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
+from vds.riff import NOT_A_WAV_FILE, WAVE_FORMAT_PCM
 
 
 class PluginInfo:
@@ -13,14 +14,18 @@ class PluginInfo:
     released: str = '23.3.9'
     type: str = 'FilePlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 10
+    scope: str = 'wav'
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'All WAV files have correct properties'
     error_message: str = 'Found {nof} files with incorrect properties'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
 
     @staticmethod
     def miliseconds_to_time(miliseconds: int) -> str:
@@ -29,25 +34,23 @@ class ValidDataSetPlugin:
         hours, minutes = divmod(minutes, 60)
         return f'{hours:02d}:{minutes:02d}:{seconds:02d}.{miliseconds:03d}'
 
-    def get_details_if_invalid_properties(self, file_path: str) -> Union[Tuple[int, int, int, str], None]:
+    def get_details_if_invalid_properties(self, record: AudioRecord) -> Union[Tuple[int, int, int, str], None]:
         if not isinstance(self.args['expected_properties'], Dict):
             return None
 
-        try:
-            with wave.open(file_path, 'rb') as wav_file:
-                sample_rate = wav_file.getframerate()
-                num_frames = wav_file.getnframes()
-                duration_ms = int((num_frames / float(sample_rate)) * 1000)
-                num_channels = wav_file.getnchannels()
+        # Files which can't be opened by the "wave" module are reported by F003
+        if record.error == NOT_A_WAV_FILE or record.header.format_tag != WAVE_FORMAT_PCM:
+            return None
 
-                if num_channels > self.args['expected_properties']['number_of_channels'] \
-                        or sample_rate != self.args['expected_properties']['sample_rate'] \
-                        or (duration_ms < self.args['expected_properties']['min_duration']
-                            or duration_ms > self.args['expected_properties']['max_duration']):
-                    return num_channels, sample_rate, duration_ms, self.miliseconds_to_time(duration_ms)
+        sample_rate = record.header.sample_rate
+        duration_ms = record.duration_ms
+        num_channels = record.header.channels
 
-        except wave.Error:
-            return None
+        if num_channels > self.args['expected_properties']['number_of_channels'] \
+                or sample_rate != self.args['expected_properties']['sample_rate'] \
+                or (duration_ms < self.args['expected_properties']['min_duration']
+                    or duration_ms > self.args['expected_properties']['max_duration']):
+            return num_channels, sample_rate, duration_ms, self.miliseconds_to_time(duration_ms)
         return None
 
     def prepare_message(self, invalid_file_properties: Tuple[int, int, int, str]) -> str:
@@ -77,24 +80,29 @@ class ValidDataSetPlugin:
 
         return f'[ {channels}, {sample_rate}, {duration} ]'
 
-    def run(self) -> None:
-        wavs_dir_path = Path(str(self.args['path'])).joinpath(str(self.args['dir_name']))
-
-        list_of_files = list(wavs_dir_path.glob('*.wav'))
-        fixed_list_of_files = []
-
-        for file_path in list_of_files:
-            fixed_list_of_files.append(str(file_path.relative_to(str(self.args['path']))))
+    def format_finding(self, finding: Finding) -> str:
+        duration_ms = finding.details['duration_ms']
+        invalid_file_properties = (
+            finding.details['number_of_channels'], finding.details['sample_rate'], duration_ms,
+            self.miliseconds_to_time(duration_ms),
+        )
+        return f'{str(finding.wav_path):>44} ' + self.prepare_message(invalid_file_properties)
 
-        for file, fixed_file in tqdm(
-                zip(list_of_files, fixed_list_of_files), total=len(list_of_files), desc=f'{self.info.name}...',
-        ):
-            invalid_file_properties = self.get_details_if_invalid_properties(
-                str(Path(wavs_dir_path).joinpath(file)),
-            )
+    def run(self) -> None:
+        for record in self.dataset.audio_records():
+            invalid_file_properties = self.get_details_if_invalid_properties(record)
 
             if invalid_file_properties:
-                self.errors.append(f'{fixed_file:>44} ' + self.prepare_message(invalid_file_properties))
+                self.findings.add(
+                    Finding(
+                        self.info.id, 'Incorrect WAV file properties', wav_path=record.path,
+                        details={
+                            'number_of_channels': invalid_file_properties[0],
+                            'sample_rate': invalid_file_properties[1],
+                            'duration_ms': invalid_file_properties[2],
+                        },
+                    ),
+                )
 
 
 def init_plugin() -> ValidDataSetPlugin:
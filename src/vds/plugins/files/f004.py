@@ -0,0 +1,90 @@
+from typing import Dict, List, Tuple, TYPE_CHECKING, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
+
+if TYPE_CHECKING:
+    from vds.samples import SampleStats
+
+
+class PluginInfo:
+    author: str = 'Tadeusz Miszczyk'
+    description: str = (
+        'Check if WAV files are not clipped, silent, DC-shifted or with long silence at the edges '
+        '(slow: reads every sample)'
+    )
+    id: str = 'F004'
+    name: str = 'WavContentChecker'
+    released: str = '23.4.2'
+    type: str = 'FilePlugin'
+    version: str = '23.4.2'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 50
+    scope: str = 'wav'
+    reads_samples: bool = True
+    opt_in: bool = True
+
+
+class ValidDataSetPlugin:
+    info: PluginInfo = PluginInfo()
+    success_message: str = 'All WAV files have correct content'
+    error_message: str = 'Found {nof} files with incorrect content'
+    args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
+    # Limits of the checks, a file exceeding any of them is reported
+    max_clipping_ratio: float = 0.001
+    max_dc_offset: float = 0.01
+    min_rms_db: float = -50.0
+    max_edge_silence_ms: int = 1000
+    problems: Dict[str, str] = {
+        'silent': 'silent',
+        'clipping': 'clipped {clipping_ratio:.2%}',
+        'dc_offset': 'DC offset {dc_offset:+.3f}',
+        'quiet': 'quiet {rms_db:.1f} dBFS',
+        'leading_silence': 'leading silence {leading_silence_ms} ms',
+        'trailing_silence': 'trailing silence {trailing_silence_ms} ms',
+    }
+
+    def format_finding(self, finding: Finding) -> str:
+        messages = [self.problems[problem].format(**finding.details) for problem in finding.details['problems']]
+        return f'{str(finding.wav_path):>44} [<invalid>{", ".join(messages)}<invalid-end>]'
+
+    def find_problems(self, stats: 'SampleStats') -> List[str]:
+        if stats.silent:
+            return ['silent']
+
+        problems = []
+        if stats.clipping_ratio > self.max_clipping_ratio:
+            problems.append('clipping')
+        if abs(stats.dc_offset) > self.max_dc_offset:
+            problems.append('dc_offset')
+        if stats.rms_db < self.min_rms_db:
+            problems.append('quiet')
+        if stats.leading_silence_ms > self.max_edge_silence_ms:
+            problems.append('leading_silence')
+        if stats.trailing_silence_ms > self.max_edge_silence_ms:
+            problems.append('trailing_silence')
+        return problems
+
+    def run(self) -> None:
+        # numpy is needed only by this plugin, so it is imported when the plugin runs
+        from vds.samples import analyze_files  # pylint: disable=import-outside-toplevel
+
+        records = self.dataset.audio_records()
+        for stats in analyze_files(self.dataset.path, records, self.dataset.jobs, self.dataset.io_limits):
+            problems = self.find_problems(stats)
+            if problems:
+                details = stats._asdict()
+                details.pop('path')
+                self.findings.add(
+                    Finding(
+                        self.info.id, 'Incorrect WAV file content', wav_path=stats.path,
+                        details={'problems': problems, **details},
+                    ),
+                )
+
+
+def init_plugin() -> ValidDataSetPlugin:
+    vds_plugin = ValidDataSetPlugin()
+    return vds_plugin
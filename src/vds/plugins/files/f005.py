@@ -0,0 +1,66 @@
+from typing import Dict, List, Tuple, Union
+
+from vds.audio import AudioRecord, hash_files
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
+from vds.riff import NOT_A_WAV_FILE, TRUNCATED
+
+
+class PluginInfo:
+    author: str = 'Tadeusz Miszczyk'
+    description: str = 'Check if the same recording is not saved in different WAV files'
+    id: str = 'F005'
+    name: str = 'DuplicatedAudioChecker'
+    released: str = '23.4.2'
+    type: str = 'FilePlugin'
+    version: str = '23.4.2'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 20
+    scope: str = 'dataset'
+    inputs: Tuple[str, ...] = ('wav_files',)
+    reads_samples: bool = True
+
+
+class ValidDataSetPlugin:
+    info: PluginInfo = PluginInfo()
+    success_message: str = 'No duplicated recordings found'
+    error_message: str = 'Found {nof} groups of WAV files with the same recording'
+    args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
+
+    def format_finding(self, finding: Finding) -> str:
+        first, *others = finding.details['wav_paths']
+        messages = [f'{first:>44} [<invalid>same samples as<invalid-end>]']
+        messages += [f'{wav_path:>44}' for wav_path in others]
+        return '\n'.join(messages)
+
+    def run(self) -> None:
+        # Files are grouped by the size of the data chunk (from the headers), a file with a unique size
+        # can't have a copy, so only files sharing their size with another file are read and hashed.
+        # Broken files are left out like in F004, a truncated file has less samples than its header says.
+        sizes: Dict[int, List[AudioRecord]] = {}
+        for record in self.dataset.audio_records():
+            data = record.header.data
+            if record.error not in (NOT_A_WAV_FILE, TRUNCATED) and data is not None and data.size > 0:
+                sizes.setdefault(data.size, []).append(record)
+
+        candidates = [record for records in sizes.values() if len(records) > 1 for record in records]
+        duplicates: Dict[Tuple[int, bytes], List[str]] = {}
+        for record, digest in hash_files(self.dataset.path, candidates, self.dataset.jobs, self.dataset.io_limits):
+            if digest is not None and record.header.data is not None:
+                duplicates.setdefault((record.header.data.size, digest), []).append(record.path)
+
+        for (size, _), wav_paths in duplicates.items():
+            if len(wav_paths) > 1:
+                self.findings.add(
+                    Finding(
+                        self.info.id, 'Duplicated recording', wav_path=wav_paths[0],
+                        details={'wav_paths': wav_paths, 'size': size},
+                    ),
+                )
+
+
+def init_plugin() -> ValidDataSetPlugin:
+    vds_plugin = ValidDataSetPlugin()
+    return vds_plugin
@@ -1,5 +1,7 @@
-from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
 
 
 class PluginInfo:
@@ -10,14 +12,29 @@ class PluginInfo:
     released: str = '23.2.26'
     type: str = 'TranscriptionPlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ()
+    cost: int = 1
+    scope: str = 'dataset'
+    inputs: Tuple[str, ...] = ('transcriptions',)
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'All transcription files and the wavs folder exist'
     error_message: str = 'Detected {nof} missing transcription file or "wavs" folder'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
+
+    def format_finding(self, finding: Finding) -> str:
+        return f'{str(finding.file):>15}'
+
+    def blocks(self, vds_plugin: Any) -> bool:
+        # Only the plugins reading WAV files are skipped (when the "wavs" folder is missing), the transcription
+        # plugins still check the transcription files which exist
+        return vds_plugin.info.type == 'FilePlugin' and any(
+            finding.file == self.args['dir_name'] for finding in self.findings
+        )
 
     def run(self) -> None:
         if not isinstance(self.args['path'], str)             \
@@ -26,8 +43,9 @@ class ValidDataSetPlugin:
             return None
 
         for file in self.args['files'] + [self.args['dir_name']]:
-            if not Path(self.args['path']).joinpath(file).exists():
-                self.errors.append(f'{str(file):>15}')
+            # The dataset checks the files in the folder or in the archive given with --args.path
+            if not self.dataset.exists(file):
+                self.findings.add(Finding(self.info.id, 'File or folder not found in dataset', file=str(file)))
 
 
 def init_plugin() -> ValidDataSetPlugin:
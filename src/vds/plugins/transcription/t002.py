@@ -1,5 +1,7 @@
-from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
 
 
 class PluginInfo:
@@ -10,39 +12,44 @@ class PluginInfo:
     released: str = '23.2.26'
     type: str = 'TranscriptionPlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 1
+    scope: str = 'line'
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'No blank lines found in transcript files'
     error_message: str = 'Found {nof} empty lines in the transcription'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
 
-    def run(self) -> None:
-        if not isinstance(self.args['path'], str):
-            return None
+    def format_finding(self, finding: Finding) -> str:
+        if finding.line_number is None:
+            return f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {finding.file}<invalid-end>'
 
-        for list_file_name in self.args['files']:
+        return (
+            f'<file>{finding.file:>15}<file-end>'
+            f'<colon>: <colon-end>'
+            f'<int>{finding.line_number:>6}<int-end>'
+            f'<colon>: <colon-end>'
+            f'<Empty Line>'
+        )
 
-            list_file_path = Path(self.args['path']).joinpath(list_file_name)
+    def run(self) -> None:
+        for transcription in self.dataset.transcriptions:
 
-            if not list_file_path.exists():
-                self.errors.append(f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {list_file_name}<invalid-end>')
+            if not transcription.exists:
+                self.findings.add(Finding(self.info.id, 'File not found in dataset', file=transcription.name))
                 continue
 
-            file_lines = list(list_file_path.read_text(encoding='UTF-8').split('\n'))
-
-            for line_number, line in enumerate(file_lines, start=1):
+            for line_number, line, *_ in transcription:
 
-                if line_number < len(file_lines):
+                if line_number < len(transcription):
                     if line in ('', '\n\n'):
-                        self.errors.append(
-                            f'<file>{str(list_file_name):>15}<file-end>'
-                            f'<colon>: <colon-end>'
-                            f'<int>{line_number:>6}<int-end>'
-                            f'<colon>: <colon-end>'
-                            f'<Empty Line>',
+                        self.findings.add(
+                            Finding(self.info.id, 'Empty line', file=transcription.name, line_number=line_number),
                         )
                         continue
 
@@ -1,5 +1,7 @@
-from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
 
 
 class PluginInfo:
@@ -10,43 +12,52 @@ class PluginInfo:
     released: str = '23.2.26'
     type: str = 'TranscriptionPlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 1
+    scope: str = 'dataset'
+    inputs: Tuple[str, ...] = ('transcriptions', 'wav_files')
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'All WAV files whose paths have been added for transcription are available'
     error_message: str = '{nof} files added to transcription do not exist'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
 
-    def run(self) -> None:
-        if not isinstance(self.args['path'], str):
-            return None
+    def format_finding(self, finding: Finding) -> str:
+        if finding.line_number is None:
+            return f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {finding.file}<invalid-end>'
+
+        return (
+            f'<file>{finding.file:>15}<file-end>'
+            f'<colon>: <colon-end>'
+            f'<int>{finding.line_number:>6}<int-end>'
+            f'<colon>: <colon-end>'
+            f'{finding.line}'
+        )
 
-        for list_file_name in self.args['files']:
+    def run(self) -> None:
+        missing_wav_paths = self.dataset.manifest().missing_wav_paths
 
-            list_file_path = Path(self.args['path']).joinpath(list_file_name)
+        for transcription in self.dataset.transcriptions:
 
-            if not list_file_path.exists():
-                self.errors.append(f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {list_file_name}<invalid-end>')
+            if not transcription.exists:
+                self.findings.add(Finding(self.info.id, 'File not found in dataset', file=transcription.name))
                 continue
 
-            file_lines = list(list_file_path.read_text(encoding='UTF-8').split('\n'))
-
-            for line_number, line in enumerate(file_lines, start=1):
+            for line_number, line, wav_path, _ in transcription:
 
                 if line in ('', '\n\n'):
                     continue
 
-                wav_path, *_ = line.split('|')
-
-                if not Path(f'{self.args["path"]}/{wav_path}').exists():
-                    self.errors.append(
-                        f'<file>{str(list_file_name):>15}<file-end>'
-                        f'<colon>: <colon-end>'
-                        f'<int>{line_number:>6}<int-end>'
-                        f'<colon>: <colon-end>'
-                        f'{line}',
+                if wav_path in missing_wav_paths:
+                    self.findings.add(
+                        Finding(
+                            self.info.id, 'WAV file added to transcription does not exist',
+                            file=transcription.name, line_number=line_number, wav_path=wav_path, line=line,
+                        ),
                     )
 
 
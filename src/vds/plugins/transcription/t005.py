@@ -1,6 +1,8 @@
 import string
-from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
 
 
 class PluginInfo:
@@ -11,47 +13,54 @@ class PluginInfo:
     released: str = '23.2.26'
     type: str = 'TranscriptionPlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 1
+    scope: str = 'line'
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'All transcriptions end with one of the following punctuation marks: ".", "?", or "!"'
     error_message: str = 'Found {nof} transcription which does not end with ".", "?" or "!"'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
 
-    def run(self) -> None:
-        if not isinstance(self.args['path'], str):
-            return None
+    def format_finding(self, finding: Finding) -> str:
+        if finding.line_number is None:
+            return f'ERROR: FILE NOT FOUND IN DATASET: {finding.file}'
 
-        for list_file_name in self.args['files']:
+        return (
+            f'<file>{finding.file:>15}<file-end>'
+            f'<colon>: <colon-end>'
+            f'<int>{finding.line_number:>6}<int-end>'
+            f'<colon>: <colon-end>'
+            f'{finding.line}'
+        )
 
-            list_file_path = Path(self.args['path']).joinpath(list_file_name)
+    def run(self) -> None:
+        for transcription in self.dataset.transcriptions:
 
-            if not list_file_path.exists():
-                self.errors.append(f'ERROR: FILE NOT FOUND IN DATASET: {list_file_name}')
+            if not transcription.exists:
+                self.findings.add(Finding(self.info.id, 'File not found in dataset', file=transcription.name))
                 continue
 
-            file_lines = list(list_file_path.read_text(encoding='UTF-8').split('\n'))
-
-            for line_number, line in enumerate(file_lines, start=1):
+            for line_number, line, wav_path, text in transcription:
 
                 if line in ('', '\n\n'):
                     continue
 
-                _, *transcription = line.split('|')
-                text = '|'.join(transcription).strip()
+                text = text.strip()
 
                 if len(text.translate(str.maketrans('', '', string.punctuation + ' '))) == 0:
                     continue
 
                 if text[-1] not in ('.', '?', '!'):
-                    self.errors.append(
-                        f'<file>{str(list_file_name):>15}<file-end>'
-                        f'<colon>: <colon-end>'
-                        f'<int>{line_number:>6}<int-end>'
-                        f'<colon>: <colon-end>'
-                        f'{line}',
+                    self.findings.add(
+                        Finding(
+                            self.info.id, 'Transcription does not end with ".", "?" or "!"',
+                            file=transcription.name, line_number=line_number, wav_path=wav_path, line=line,
+                        ),
                     )
 
 
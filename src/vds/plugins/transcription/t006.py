@@ -1,5 +1,7 @@
-from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex
+from vds.findings import Finding, Findings
 
 
 class PluginInfo:
@@ -10,31 +12,43 @@ class PluginInfo:
     released: str = '23.2.26'
     type: str = 'TranscriptionPlugin'
     version: str = '23.3.9'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 1
+    scope: str = 'line'
 
 
 class ValidDataSetPlugin:
     info: PluginInfo = PluginInfo()
-    errors: List[str] = []
     success_message: str = 'All PIPE characters used in the translation files are in the same quantity'
     error_message: str = 'The PIPE symbol has been used more times than the default setting allows ' \
                          '(in {nof} transcriptions)'
     args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
+
+    def format_finding(self, finding: Finding) -> str:
+        if finding.line_number is None:
+            return f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {finding.file}<invalid-end>'
+
+        return (
+            f'<file>{finding.file:>15}<file-end>'
+            f'<colon>: <colon-end>'
+            f'<int>{finding.line_number:>6}<int-end>'
+            f'<colon>: <colon-end>'
+            f'{finding.line}'
+        )
 
     def run(self) -> None:
-        if not isinstance(self.args['path'], str) or not isinstance(self.args['expected_properties'], dict):
+        if not isinstance(self.args['expected_properties'], dict):
             return None
 
-        for list_file_name in self.args['files']:
+        for transcription in self.dataset.transcriptions:
 
-            list_file_path = Path(self.args['path']).joinpath(list_file_name)
-
-            if not list_file_path.exists():
-                self.errors.append(f'<invalid>ERROR: FILE NOT FOUND IN DATASET: {list_file_name}<invalid-end>')
+            if not transcription.exists:
+                self.findings.add(Finding(self.info.id, 'File not found in dataset', file=transcription.name))
                 continue
 
-            file_lines = list(list_file_path.read_text(encoding='UTF-8').split('\n'))
-
-            for line_number, line in enumerate(file_lines, start=1):
+            for line_number, line, wav_path, _ in transcription:
 
                 if line in ('', '\n\n'):
                     continue
@@ -42,12 +56,11 @@ class ValidDataSetPlugin:
                 pipes_number = line.count('|')
 
                 if pipes_number > int(self.args['expected_properties']['number_of_pipes']):
-                    self.errors.append(
-                        f'<file>{str(list_file_name):>15}<file-end>'
-                        f'<colon>: <colon-end>'
-                        f'<int>{line_number:>6}<int-end>'
-                        f'<colon>: <colon-end>'
-                        f'{line}',
+                    self.findings.add(
+                        Finding(
+                            self.info.id, 'Too many PIPE characters', file=transcription.name,
+                            line_number=line_number, wav_path=wav_path, line=line, details={'pipes': pipes_number},
+                        ),
                     )
 
 
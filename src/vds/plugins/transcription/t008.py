@@ -0,0 +1,95 @@
+from typing import Dict, List, Tuple, Union
+
+from vds.dataset import DatasetIndex, TranscriptionLine
+from vds.findings import Finding, Findings
+
+
+class PluginInfo:
+    author: str = 'Tadeusz Miszczyk'
+    description: str = 'Check if the same or almost the same sentence is not used for different WAV files'
+    id: str = 'T008'
+    name: str = 'SimilarTranscriptionChecker'
+    released: str = '23.4.2'
+    type: str = 'TranscriptionPlugin'
+    version: str = '23.4.2'
+    dependencies: Tuple[str, ...] = ('T001',)
+    cost: int = 5
+    scope: str = 'dataset'
+    inputs: Tuple[str, ...] = ('transcriptions',)
+
+
+class ValidDataSetPlugin:
+    info: PluginInfo = PluginInfo()
+    success_message: str = 'No duplicated sentences found in transcriptions'
+    error_message: str = 'Found {nof} groups of duplicated or similar sentences in transcription files'
+    args: Dict[str, Union[str, List[str], Dict[str, int]]]
+    dataset: DatasetIndex
+    findings: Findings
+    # Minimal Jaccard similarity of 5 byte fragments of normalized texts
+    similarity_threshold: float = 0.7
+
+    def format_finding(self, finding: Finding) -> str:
+        messages = []
+        marker = '<warning>[similar]<warning-end>' if finding.details['similar'] else '<invalid>[same]<invalid-end>'
+        if finding.details['splits'] > 1:
+            marker += ' <invalid>[in different files]<invalid-end>'
+
+        for occurrence in finding.details['occurrences']:
+            messages.append(
+                '<file>{file:>15}<file-end>'
+                '<colon>: <colon-end>'
+                '<int>{line_number:>6}<int-end>'
+                '<colon>: <colon-end>'
+                '{wav_path}|{transcription}'.format(**occurrence),
+            )
+        return marker + '\n' + '\n'.join(messages)
+
+    def run(self) -> None:
+        # numpy is needed only by this plugin, so it is imported when the plugin runs
+        from vds.similarity import normalize_text, similar_groups  # pylint: disable=import-outside-toplevel
+
+        # Exact duplicates (after normalization) are found with a dict, only unique texts are compared with MinHash
+        occurrences: Dict[bytes, List[Tuple[str, TranscriptionLine]]] = {}
+        for transcription in self.dataset.transcriptions:
+            for transcription_line in transcription:
+                normalized_text = normalize_text(transcription_line.transcription)
+                if normalized_text:
+                    occurrences.setdefault(normalized_text, []).append((transcription.name, transcription_line))
+
+        texts = list(occurrences)
+        groups = similar_groups(texts, self.similarity_threshold)
+        similar_texts = {index for group in groups for index in group}
+        groups += [
+            [index] for index, text in enumerate(texts) if len(occurrences[text]) > 1 and index not in similar_texts
+        ]
+
+        for group in sorted(groups):
+            entries = [entry for index in group for entry in occurrences[texts[index]]]
+            # The same line with the same WAV file is reported by T007
+            if len({transcription_line.wav_path for _, transcription_line in entries}) < 2:
+                continue
+
+            file, first_line = entries[0]
+            self.findings.add(
+                Finding(
+                    self.info.id, 'Similar transcriptions' if len(group) > 1 else 'Duplicated transcription',
+                    file=file, line_number=first_line.line_number, wav_path=first_line.wav_path,
+                    details={
+                        'similar': len(group) > 1,
+                        'splits': len({name for name, _ in entries}),
+                        'occurrences': [
+                            {
+                                'file': name, 'line_number': transcription_line.line_number,
+                                'wav_path': transcription_line.wav_path,
+                                'transcription': transcription_line.transcription,
+                            }
+                            for name, transcription_line in entries
+                        ],
+                    },
+                ),
+            )
+
+
+def init_plugin() -> ValidDataSetPlugin:
+    vds_plugin = ValidDataSetPlugin()
+    return vds_plugin
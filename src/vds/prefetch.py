@@ -0,0 +1,52 @@
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, NamedTuple, TYPE_CHECKING, TypeVar
+
+from vds import profiler
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+Item = TypeVar('Item')
+Result = TypeVar('Result')
+
+# Calls waiting in the queue for every thread, when the in-flight limit is not given
+IN_FLIGHT_PER_THREAD = 4
+
+
+class IOLimits(NamedTuple):
+    # Every run imports it (vds.dataset, vds.api), so this module imports nothing heavy at the top.
+    # threads=0 keeps the default backend (a process per --jobs), in_flight=0 uses IN_FLIGHT_PER_THREAD
+    threads: int = 0
+    in_flight: int = 0
+
+
+def prefetch(
+        function: Callable[[Item], Result], items: Iterable[Item], threads: int, in_flight: int = 0,
+) -> Iterator[Result]:
+    # For latency-bound I/O (NFS, FUSE mounts of object stores) a thread spends most of its time waiting for the
+    # server, so many requests are kept outstanding at once. Unlike executor.map(), which submits every item before
+    # the first result, at most in_flight calls are submitted ahead of the consumer, so memory use stays bounded.
+    # Results are yielded in the order of items.
+    # concurrent.futures (with logging) is imported only by runs which use the threads
+    from concurrent.futures import ThreadPoolExecutor  # pylint: disable=import-outside-toplevel
+
+    in_flight = max(in_flight or threads * IN_FLIGHT_PER_THREAD, threads)
+    pending: Deque['Future[Result]'] = deque()
+    # Files and bytes read by the threads are counted for the plugin which started them
+    workers = profiler.WorkerThreads()
+
+    with ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='vds-io', initializer=workers.start,
+    ) as executor:
+        try:
+            for item in items:
+                pending.append(executor.submit(function, item))
+                if len(pending) >= in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # A consumer which stops early doesn't wait for calls it will never use
+            for future in pending:
+                future.cancel()
+            workers.finish()
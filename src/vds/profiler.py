@@ -0,0 +1,215 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, TextIO
+
+_local = threading.local()
+_audit_hook_installed = False
+
+
+class PluginStats:
+    __slots__ = ('plugin_id', 'wall_time', 'cpu_time', 'files', 'lines', 'bytes_read', 'opens', 'peak_rss')
+
+    def __init__(self, plugin_id: str) -> None:
+        self.plugin_id = plugin_id
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.files = 0
+        self.lines = 0
+        self.bytes_read: Optional[int] = None
+        self.opens = 0
+        self.peak_rss: Optional[int] = None
+
+    def per_second(self, value: int) -> float:
+        return value / self.wall_time if self.wall_time > 0 else 0.0
+
+    def add(self, stats: 'PluginStats', cpu_time: Optional[float], bytes_read: Optional[int]) -> None:
+        self.cpu_time += cpu_time or 0.0
+        self.files += stats.files
+        self.lines += stats.lines
+        self.opens += stats.opens
+        if bytes_read is not None:
+            self.bytes_read = (self.bytes_read or 0) + bytes_read
+
+    def to_dict(self) -> Dict[str, Any]:
+        content = {name: getattr(self, name) for name in self.__slots__}
+        content['files_per_second'] = self.per_second(self.files)
+        content['lines_per_second'] = self.per_second(self.lines)
+        return content
+
+
+def count(files: int = 0, lines: int = 0) -> None:
+    # Called by the dataset for every plugin thread, does nothing when the run is not profiled
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.files += files
+        stats.lines += lines
+
+
+def audit_hook(event: str, _: Any) -> None:
+    if event == 'open':
+        stats = getattr(_local, 'stats', None)
+        if stats is not None:
+            stats.opens += 1
+
+
+def thread_bytes_read(thread_id: Optional[int] = None) -> Optional[int]:
+    # Bytes read by read() calls of a thread (the current one by default), only available on Linux
+    try:
+        with open('/proc/thread-self/io' if thread_id is None else f'/proc/self/task/{thread_id}/io', 'rb') as file:
+            for line in file:
+                if line.startswith(b'rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def thread_cpu_time(thread_ident: int) -> Optional[float]:
+    # CPU time of any thread of the process, not available on Windows
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_ident))
+    except (AttributeError, OSError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    # Peak memory of the whole process in bytes, plugins run in threads, so it can't be split between them
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class WorkerThread(NamedTuple):
+    native_id: int
+    ident: int
+    cpu_time: float
+    bytes_read: Optional[int]
+    stats: PluginStats
+
+
+class WorkerThreads:
+    # Counters of the threads started by a plugin (prefetch()), which are added to the stats of the plugin. Every
+    # thread counts into its own stats, so the counters need no lock, and they are added up when the work is done.
+    __slots__ = ('stats', 'threads', 'lock')
+
+    def __init__(self) -> None:
+        # Created by the thread which starts the workers, does nothing when it is not profiled
+        self.stats: Optional[PluginStats] = getattr(_local, 'stats', None)
+        self.threads: List[WorkerThread] = []
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        # Initializer of every worker thread
+        if self.stats is not None:
+            worker = WorkerThread(
+                threading.get_native_id(), threading.get_ident(), time.thread_time(), thread_bytes_read(),
+                PluginStats(self.stats.plugin_id),
+            )
+            _local.stats = worker.stats
+            with self.lock:
+                self.threads.append(worker)
+
+    def finish(self) -> None:
+        # Called while the workers still exist, /proc has no counters of finished threads
+        if self.stats is None:
+            return
+        # Reading the counters is not work of the plugin
+        _local.stats = None
+        try:
+            with self.lock:
+                for worker in self.threads:
+                    cpu_time = thread_cpu_time(worker.ident)
+                    bytes_read = thread_bytes_read(worker.native_id)
+                    self.stats.add(
+                        worker.stats,
+                        None if cpu_time is None else cpu_time - worker.cpu_time,
+                        None if bytes_read is None or worker.bytes_read is None else bytes_read - worker.bytes_read,
+                    )
+                self.threads.clear()
+        finally:
+            _local.stats = self.stats
+
+
+class Profiler:
+    def __init__(self, cprofile_path: Optional[Path] = None) -> None:
+        global _audit_hook_installed  # pylint: disable=global-statement
+        self.cprofile_path = cprofile_path
+        self.stats: List[PluginStats] = []
+        self.lock = threading.Lock()
+        self.start_time = time.perf_counter()
+
+        # Audit hooks can't be removed, so the hook is added once and only when a run is profiled
+        if not _audit_hook_installed:
+            sys.addaudithook(audit_hook)
+            _audit_hook_installed = True
+
+        if self.cprofile_path:
+            self.cprofile_path.mkdir(parents=True, exist_ok=True)
+
+    def run(self, vds_plugin: Any) -> None:
+        stats = PluginStats(vds_plugin.info.id)
+        bytes_before = thread_bytes_read()
+        _local.stats = stats
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+
+        try:
+            if self.cprofile_path:
+                import cProfile  # pylint: disable=import-outside-toplevel
+                profile = cProfile.Profile()
+                try:
+                    profile.runcall(vds_plugin.run)
+                finally:
+                    profile.dump_stats(str(self.cprofile_path / f'{stats.plugin_id}.prof'))
+            else:
+                vds_plugin.run()
+        finally:
+            stats.wall_time = time.perf_counter() - wall_start
+            # CPU time and bytes read by the worker threads of the plugin are already added
+            stats.cpu_time += time.thread_time() - cpu_start
+            _local.stats = None
+            bytes_after = thread_bytes_read()
+            if bytes_before is not None and bytes_after is not None:
+                stats.bytes_read = (stats.bytes_read or 0) + bytes_after - bytes_before
+            stats.peak_rss = peak_rss()
+            with self.lock:
+                self.stats.append(stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_time': time.perf_counter() - self.start_time,
+            'peak_rss': peak_rss(),
+            'plugins': [stats.to_dict() for stats in sorted(self.stats, key=lambda stats: stats.plugin_id)],
+        }
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=4) + '\n', encoding='UTF-8')
+
+    def print_table(self, stream: TextIO) -> None:
+        from rich.console import Console  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+        from rich.table import Table  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+
+        mebibyte = 1024 * 1024
+        table = Table(title='Profile')
+
+        table.add_column('ID', justify='center', style='cyan', no_wrap=True)
+        for column in ('Wall ms', 'CPU ms', 'Files/s', 'Lines/s', 'Read MiB', 'Opens', 'RSS MiB'):
+            table.add_column(column, justify='right', no_wrap=True)
+
+        for stats in sorted(self.stats, key=lambda stats: stats.plugin_id):
+            table.add_row(
+                stats.plugin_id,
+                f'{stats.wall_time * 1000:.1f}',
+                f'{stats.cpu_time * 1000:.1f}',
+                f'{stats.per_second(stats.files):.0f}',
+                f'{stats.per_second(stats.lines):.0f}',
+                '-' if stats.bytes_read is None else f'{stats.bytes_read / mebibyte:.2f}',
+                str(stats.opens),
+                '-' if stats.peak_rss is None else f'{stats.peak_rss / mebibyte:.1f}',
+            )
+        Console(file=stream).print(table)
@@ -0,0 +1,104 @@
+import os
+import re
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+PLUGINS_PATH = Path(__file__).parent / 'plugins'
+PLUGIN_DIRECTORIES = ('transcription', 'files')
+# The PluginInfo class: from its first line to the next line which is not indented
+PLUGIN_INFO_PATTERN = re.compile(r'^class PluginInfo\b.*?(?=^\S|\Z)', re.MULTILINE | re.DOTALL)
+
+
+class PluginMetadata(NamedTuple):
+    path: Path
+    id: str
+    name: str = ''
+    description: str = ''
+    author: str = ''
+    released: str = ''
+    type: str = ''
+    version: str = ''
+    dependencies: Tuple[str, ...] = ()
+    cost: int = 1
+    scope: str = 'dataset'
+    inputs: Tuple[str, ...] = ('transcriptions', 'wav_files')
+    reads_samples: bool = False
+    opt_in: bool = False
+
+
+_modules: Dict[Path, ModuleType] = {}
+_metadata: Dict[Path, Tuple[int, PluginMetadata]] = {}
+_registry_lock = threading.Lock()
+
+
+def plugin_files(disabled_plugins: Iterable[str] = ()) -> List[Path]:
+    disabled_files = {f'{plugin_id.lower()}.py' for plugin_id in disabled_plugins}
+    files = [
+        PLUGINS_PATH / directory / file
+        for directory in PLUGIN_DIRECTORIES
+        for file in os.listdir(PLUGINS_PATH / directory)
+        if file.endswith('.py') and file not in disabled_files
+    ]
+    return sorted(files, key=lambda file: file.name)
+
+
+def read_plugin_metadata(path: Path) -> PluginMetadata:
+    # PluginInfo holds only literals, so it is read from the source code without executing the plugin.
+    # Only the source of the class is parsed, and ast is imported only by runs which need the metadata
+    # (--plugins.list, SARIF, archives).
+    import ast  # pylint: disable=import-outside-toplevel
+
+    source = path.read_text(encoding='UTF-8')
+    match = PLUGIN_INFO_PATTERN.search(source)
+    values: Dict[str, Any] = {}
+    for node in ast.parse(match.group() if match else source, str(path)).body:
+        if isinstance(node, ast.ClassDef) and node.name == 'PluginInfo':
+            for statement in node.body:
+                if isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name) \
+                        and statement.value is not None and statement.target.id in PluginMetadata._fields:
+                    values[statement.target.id] = ast.literal_eval(statement.value)
+
+    if 'id' not in values:
+        raise ImportError(f'Plugin {path} has no PluginInfo.id')
+    return PluginMetadata(path=path, **values)
+
+
+def plugin_metadata(path: Path) -> PluginMetadata:
+    # Parsed once per process and again only when the plugin file changes
+    modification_time = os.stat(path).st_mtime_ns
+    with _registry_lock:
+        if path not in _metadata or _metadata[path][0] != modification_time:
+            _metadata[path] = (modification_time, read_plugin_metadata(path))
+        return _metadata[path][1]
+
+
+def list_plugin_metadata(disabled_plugins: Iterable[str] = ()) -> List[PluginMetadata]:
+    return [plugin_metadata(path) for path in plugin_files(disabled_plugins)]
+
+
+def load_plugin_module(path: Path) -> ModuleType:
+    # Every plugin file is executed once per process, each run creates its own instances with init_plugin()
+    import importlib.util  # pylint: disable=import-outside-toplevel
+
+    with _registry_lock:
+        if path not in _modules:
+            spec = importlib.util.spec_from_file_location(path.stem, str(path))
+            if spec is None:
+                raise ImportError(f'Can not load plugin {path}')
+            plugin_module = importlib.util.module_from_spec(spec)
+            if spec.loader is not None:
+                spec.loader.exec_module(plugin_module)
+            _modules[path] = plugin_module
+        return _modules[path]
+
+
+def load_plugin_modules(disabled_plugins: Iterable[str] = (), enabled_plugins: Iterable[str] = ()) -> List[ModuleType]:
+    # Opt-in plugins (PluginInfo.opt_in, like the slow F004) are loaded only when enabled_plugins lists them
+    enabled = set(enabled_plugins)
+    return [
+        plugin_module for plugin_module in map(load_plugin_module, plugin_files(disabled_plugins))
+        if not getattr(plugin_module.ValidDataSetPlugin.info, 'opt_in', False)
+        or plugin_module.ValidDataSetPlugin.info.id in enabled
+    ]
@@ -0,0 +1,177 @@
+import errno
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, List, NamedTuple, Set
+
+from vds.dataset import DatasetIndex, READ_BUFFER_SIZE
+from vds.prefetch import prefetch
+from vds.riff import HAS_METADATA, scan_file, WAVE_FORMAT_PCM
+
+# A RIFF file keeps its size in 32 bits, bigger files would need RF64
+MAX_RIFF_SIZE = 0xFFFFFFFF
+# Largest count of bytes a single sendfile() call copies on Linux is a bit smaller than 2 GiB
+SENDFILE_BLOCK_SIZE = 1024 * 1024 * 1024
+COPY_BLOCK_SIZE = 16 * 1024 * 1024
+# sendfile() to a regular file is not supported everywhere (macOS sends only to sockets), mmap is used then
+SENDFILE_ERRORS = (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, errno.EOPNOTSUPP)
+
+
+class TranscriptionFix(NamedTuple):
+    name: str
+    empty_lines: int
+    duplicated_lines: int
+
+
+class RepairSummary(NamedTuple):
+    fixed_wav_files: List[str]
+    failed_wav_files: List[str]
+    transcriptions: List[TranscriptionFix]
+    failed_transcriptions: List[str]
+
+
+def replace_file(path: Path, write: Callable[[BinaryIO], bool]) -> bool:
+    # The new content is written to a file next to the old one and moved over it with a single rename, so the file is
+    # never left half-written. write() returns False when there is nothing to change, then the file stays untouched.
+    descriptor, temporary_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    replaced = False
+    try:
+        with open(descriptor, 'wb') as file:
+            if not write(file):
+                return False
+            file.flush()
+            os.fsync(file.fileno())
+        shutil.copymode(path, temporary_name)
+        if hasattr(os, 'chown'):
+            # copymode() keeps only the permissions. A file which can't get its owner back (a user can't give
+            # a file to someone else) is not replaced.
+            original = os.stat(path)
+            os.chown(temporary_name, original.st_uid, original.st_gid)
+        os.replace(temporary_name, path)
+        replaced = True
+    finally:
+        if not replaced:
+            Path(temporary_name).unlink(missing_ok=True)
+    return True
+
+
+def copy_range(source: BinaryIO, target: BinaryIO, offset: int, size: int) -> None:
+    # Samples are copied by the kernel (or from the page cache with mmap), they are never decoded nor read into Python
+    target.flush()
+    while size > 0 and hasattr(os, 'sendfile'):
+        try:
+            sent = os.sendfile(target.fileno(), source.fileno(), offset, min(size, SENDFILE_BLOCK_SIZE))
+        except OSError as error:
+            if error.errno not in SENDFILE_ERRORS:
+                raise
+            break
+        if sent == 0:
+            raise OSError(errno.EIO, 'File is shorter than its data chunk', source.name)
+        offset, size = offset + sent, size - sent
+
+    if size > 0:
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as samples:
+            for start in range(offset, offset + size, COPY_BLOCK_SIZE):
+                target.write(samples[start:min(start + COPY_BLOCK_SIZE, offset + size)])
+
+
+def fix_wav_file(path: Path) -> bool:
+    # Only the fmt and data chunks are kept (everything F003 reports as metadata is dropped), and the fact chunk of
+    # formats other than PCM (float, EXTENSIBLE), which need it. The header is scanned again, because the file could
+    # change since the check, and files with other problems are left as they are.
+    header = scan_file(path)
+    data = header.data
+    kept_chunk_ids = (b'fmt ',) if header.format_tag == WAVE_FORMAT_PCM else (b'fmt ', b'fact')
+    chunks = [chunk for chunk in header.chunks if chunk.id in kept_chunk_ids]
+    if header.error != HAS_METADATA or data is None or not any(chunk.id == b'fmt ' for chunk in chunks):
+        return False
+
+    endian = '>' if header.big_endian else '<'
+    riff_size = 4 + sum(8 + chunk.size + chunk.size % 2 for chunk in (*chunks, data))
+    if riff_size > MAX_RIFF_SIZE:
+        return False
+
+    with open(path, 'rb') as source:
+        if data.offset + data.size > os.fstat(source.fileno()).st_size:
+            return False
+        payloads = []
+        for chunk in chunks:
+            source.seek(chunk.offset)
+            payloads.append(source.read(chunk.size))
+
+        def write(target: BinaryIO) -> bool:
+            target.write(struct.pack(f'{endian}4sI4s', b'RIFX' if header.big_endian else b'RIFF', riff_size, b'WAVE'))
+            for chunk, payload in zip(chunks, payloads):
+                target.write(struct.pack(f'{endian}4sI', chunk.id, chunk.size))
+                target.write(payload + b'\x00' * (chunk.size % 2))
+            target.write(struct.pack(f'{endian}4sI', b'data', data.size))
+            copy_range(source, target, data.offset, data.size)
+            target.write(b'\x00' * (data.size % 2))
+            return True
+
+        return replace_file(path, write)
+
+
+def fix_transcription(name: str, path: Path) -> TranscriptionFix:
+    # A single streaming pass drops empty lines (T002) and repeated lines, the other lines keep their bytes and order
+    empty_lines = 0
+    duplicated_lines = 0
+
+    def write(target: BinaryIO) -> bool:
+        nonlocal empty_lines, duplicated_lines
+        seen_lines: Set[bytes] = set()
+        with open(path, 'rb', buffering=READ_BUFFER_SIZE) as source:
+            for line in source:
+                text = line.rstrip(b'\r\n')
+                if not text:
+                    empty_lines += 1
+                elif text in seen_lines:
+                    duplicated_lines += 1
+                else:
+                    seen_lines.add(text)
+                    target.write(line)
+        return empty_lines + duplicated_lines > 0
+
+    replace_file(path, write)
+    return TranscriptionFix(name, empty_lines, duplicated_lines)
+
+
+def fix_wav_file_safely(path: Path) -> bool:
+    try:
+        return fix_wav_file(path)
+    except OSError:
+        # A file which can't be rewritten (read-only, removed meanwhile) doesn't stop the others
+        return False
+
+
+def fix_dataset(dataset: DatasetIndex, threads: int = 1) -> RepairSummary:
+    # WAV files are rewritten by many threads: every copy waits for the disk and sendfile() doesn't hold the GIL
+    from tqdm import tqdm  # type: ignore  # pylint: disable=import-outside-toplevel
+
+    wav_files = [record.path for record in dataset.audio_records() if record.error == HAS_METADATA]
+    results = prefetch(
+        fix_wav_file_safely, (Path(dataset.path).joinpath(wav_file) for wav_file in wav_files), max(1, threads),
+    )
+    fixed = list(tqdm(results, total=len(wav_files), desc='Fix...'))
+
+    transcriptions: List[TranscriptionFix] = []
+    failed_transcriptions: List[str] = []
+    for transcription in dataset.transcriptions:
+        if not transcription.exists:
+            continue
+        try:
+            transcriptions.append(fix_transcription(transcription.name, transcription.path))
+        except OSError:
+            # Like for WAV files, a file which can't be rewritten (read-only folder, removed meanwhile) doesn't stop
+            # the others
+            failed_transcriptions.append(transcription.name)
+
+    return RepairSummary(
+        fixed_wav_files=[wav_file for wav_file, is_fixed in zip(wav_files, fixed) if is_fixed],
+        failed_wav_files=[wav_file for wav_file, is_fixed in zip(wav_files, fixed) if not is_fixed],
+        transcriptions=transcriptions,
+        failed_transcriptions=failed_transcriptions,
+    )
@@ -0,0 +1,51 @@
+import re
+import sys
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, TextIO, Type
+
+from vds.colorizer import Colorizer
+
+ANSI_ESCAPE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class Report:
+    def __init__(self, output: Optional[Path], colorizer: Colorizer, stream: TextIO = sys.stdout) -> None:
+        self.colorizer = colorizer
+        self.stream = stream
+        self.plain_colorizer = Colorizer(colors=False)
+        # One handle for the whole run, the file gets plain text and the terminal gets colors
+        self.file: Optional[TextIO] = None
+        if output:
+            self.file = open(output, 'w', encoding='UTF-8', buffering=WRITE_BUFFER_SIZE)
+
+    def line(self, text: str) -> None:
+        plain_text = ANSI_ESCAPE.sub('', text)
+        if self.file:
+            self.file.write(plain_text)
+        print(text if self.colorizer.colors else plain_text, file=self.stream)
+
+    def finding(self, text: str) -> None:
+        if self.file:
+            self.file.write(self.plain_colorizer.colorize(text))
+        print(self.colorizer.colorize(text), file=self.stream)
+
+    def flush(self) -> None:
+        if self.file:
+            self.file.flush()
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> 'Report':
+        return self
+
+    def __exit__(
+            self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,175 @@
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple, Union
+
+# Error types reported by the scanner (same meaning as the F003 messages)
+NOT_A_WAV_FILE = 0
+HAS_METADATA = 1
+TRUNCATED = 2
+UNKNOWN_ERROR = 3
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+KNOWN_WAVE_FORMATS = (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT)
+SKIPPED_CHUNKS = (b'fact', b'LIST', b'JUNK', b'Fake')
+
+EXTENSIBLE_GUID_TAIL = {
+    '<': b'\x00\x00\x10\x00\x80\x00\x00\xAA\x00\x38\x9B\x71',
+    '>': b'\x00\x00\x00\x10\x80\x00\x00\xAA\x00\x38\x9B\x71',
+}
+
+
+class Chunk(NamedTuple):
+    id: bytes
+    offset: int
+    size: int
+
+
+class WavHeader:
+    __slots__ = (
+        'format_tag', 'channels', 'sample_rate', 'byte_rate', 'block_align', 'bits_per_sample',
+        'big_endian', 'chunks', 'error',
+    )
+
+    def __init__(self) -> None:
+        self.format_tag: int = 0
+        self.channels: int = 0
+        self.sample_rate: int = 0
+        self.byte_rate: int = 0
+        self.block_align: int = 0
+        self.bits_per_sample: int = 0
+        self.big_endian: bool = False
+        self.chunks: List[Chunk] = []
+        self.error: Optional[int] = None
+
+    @property
+    def data(self) -> Optional[Chunk]:
+        for chunk in self.chunks:
+            if chunk.id == b'data':
+                return chunk
+        return None
+
+    def set_error(self, error: int) -> None:
+        # Only the first problem counts, just like the first WavFileWarning raised by scipy
+        if self.error is None:
+            self.error = error
+
+
+def read_fmt_chunk(header: WavHeader, payload: bytes, size: int, endian: str) -> bool:
+    if size < 16 or len(payload) < 16:
+        return False
+
+    (
+        header.format_tag, header.channels, header.sample_rate,
+        header.byte_rate, header.block_align, header.bits_per_sample,
+    ) = struct.unpack(f'{endian}HHIIHH', payload[:16])
+
+    if header.format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 18:
+        extension_size = struct.unpack(f'{endian}H', payload[16:18])[0]
+        if extension_size < 22 or len(payload) < 40:
+            return False
+        raw_guid = payload[24:40]
+        if raw_guid.endswith(EXTENSIBLE_GUID_TAIL[endian]):
+            header.format_tag = struct.unpack(f'{endian}I', raw_guid[:4])[0]
+
+    if header.format_tag not in KNOWN_WAVE_FORMATS:
+        return False
+
+    return header.format_tag != WAVE_FORMAT_PCM or header.byte_rate == header.sample_rate * header.block_align
+
+
+def has_valid_samples(header: WavHeader) -> bool:
+    if header.channels == 0 or header.block_align // header.channels == 0:
+        return False
+
+    if header.format_tag == WAVE_FORMAT_PCM:
+        return header.bits_per_sample <= 64 or header.block_align // header.channels in (3, 5, 6, 7)
+    return header.bits_per_sample in (32, 64)
+
+
+def read_riff_header(file: BinaryIO, header: WavHeader) -> Optional[Tuple[str, int, int, Optional[int]]]:
+    riff = file.read(12)
+    if len(riff) < 12 or riff[:4] not in (b'RIFF', b'RIFX', b'RF64') or riff[8:12] != b'WAVE':
+        return None
+
+    endian = '>' if riff[:4] == b'RIFX' else '<'
+    header.big_endian = endian == '>'
+
+    if riff[:4] != b'RF64':
+        return endian, struct.unpack(f'{endian}I', riff[4:8])[0] + 8, 12, None
+
+    ds64 = file.read(24)
+    if len(ds64) < 24 or ds64[:4] != b'ds64':
+        return None
+    ds64_size, riff_size, data_size = struct.unpack('<IQQ', ds64[4:24])
+    return endian, riff_size + 8, 20 + ds64_size, data_size
+
+
+def read_chunk(
+        file: BinaryIO, header: WavHeader, position: int, endian: str, file_size: int, rf64_data_size: Optional[int],
+) -> Optional[int]:
+    file.seek(position)
+    chunk_header = file.read(8)
+    data_found = header.data is not None
+
+    if not chunk_header:
+        header.set_error(TRUNCATED if data_found else NOT_A_WAV_FILE)
+        return None
+    if len(chunk_header) < 4:
+        header.set_error(UNKNOWN_ERROR if header.format_tag and data_found else NOT_A_WAV_FILE)
+        return None
+
+    chunk_id = chunk_header[:4]
+    if chunk_id not in SKIPPED_CHUNKS + (b'fmt ', b'data'):
+        header.set_error(HAS_METADATA)
+    if len(chunk_header) < 8:
+        header.set_error(NOT_A_WAV_FILE)
+        return None
+
+    size = struct.unpack(f'{endian}I', chunk_header[4:])[0]
+    offset = position + 8
+
+    if chunk_id == b'fmt ' and not read_fmt_chunk(header, file.read(min(size, 40)), size, endian):
+        header.set_error(NOT_A_WAV_FILE)
+        return None
+
+    if chunk_id == b'data':
+        if not header.format_tag or not has_valid_samples(header):
+            header.set_error(NOT_A_WAV_FILE)
+            return None
+        size = size if rf64_data_size is None else rf64_data_size
+        if offset + size > file_size:
+            header.chunks.append(Chunk(chunk_id, offset, size))
+            header.set_error(TRUNCATED)
+            return None
+
+    header.chunks.append(Chunk(chunk_id, offset, size))
+    return offset + size + size % 2
+
+
+def scan(file: BinaryIO, file_size: int) -> WavHeader:
+    # Walks only the chunk headers, the data chunk is skipped with seek() and never read
+    header = WavHeader()
+
+    riff_header = read_riff_header(file, header)
+    if riff_header is None:
+        header.set_error(NOT_A_WAV_FILE)
+        return header
+
+    endian, declared_size, position, rf64_data_size = riff_header
+    next_position: Optional[int] = position
+
+    while next_position is not None and next_position < declared_size:
+        next_position = read_chunk(file, header, next_position, endian, file_size, rf64_data_size)
+
+    if header.data is None:
+        header.set_error(NOT_A_WAV_FILE)
+    return header
+
+
+def scan_file(path: Union[str, Path]) -> WavHeader:
+    with open(path, 'rb', buffering=0) as file:
+        return scan(file, os.fstat(file.fileno()).st_size)
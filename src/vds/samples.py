@@ -0,0 +1,119 @@
+import math
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from vds import profiler
+from vds.audio import AudioRecord
+from vds.prefetch import IOLimits, prefetch
+from vds.riff import NOT_A_WAV_FILE, TRUNCATED, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, WavHeader
+
+# Frames converted to float at once, so memory use does not depend on the length of a file
+BATCH_FRAMES = 1024 * 1024
+# Frames quieter than this are silence (-50 dBFS)
+SILENCE_LEVEL = 10 ** (-50 / 20)
+# Lowest level reported in dBFS, instead of -inf for digital silence
+MIN_DB = -120.0
+
+
+class SampleStats(NamedTuple):
+    path: str
+    peak_db: float
+    rms_db: float
+    clipping_ratio: float
+    dc_offset: float
+    leading_silence_ms: int
+    trailing_silence_ms: int
+    silent: bool
+
+
+def to_db(value: float) -> float:
+    return max(MIN_DB, 20 * math.log10(value)) if value > 0 else MIN_DB
+
+
+def sample_format(header: WavHeader) -> Optional[Tuple[str, float, float]]:
+    # numpy dtype, value of silence and full scale, None for formats without a numpy type (like 24-bit PCM)
+    sample_size = header.block_align // header.channels if header.channels else 0
+    endian = '>' if header.big_endian else '<'
+
+    if header.format_tag == WAVE_FORMAT_IEEE_FLOAT and sample_size in (4, 8):
+        return f'{endian}f{sample_size}', 0.0, 1.0
+    if header.format_tag == WAVE_FORMAT_PCM and sample_size == 1:
+        return 'u1', 128.0, 128.0
+    if header.format_tag == WAVE_FORMAT_PCM and sample_size in (2, 4, 8):
+        return f'{endian}i{sample_size}', 0.0, float(2 ** (sample_size * 8 - 1))
+    return None
+
+
+def analyze_file(dataset_path: str, record: AudioRecord) -> Optional[SampleStats]:
+    # numpy is imported only when samples are checked, so it does not slow down the start of vds
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    header = record.header
+    data = header.data
+    file_format = sample_format(header)
+    if record.error in (NOT_A_WAV_FILE, TRUNCATED) or data is None or file_format is None \
+            or data.size < header.block_align:
+        return None
+
+    dtype, zero, full_scale = file_format
+    # Samples are read by the kernel on demand from the page cache, they are never copied into Python objects
+    try:
+        samples = numpy.memmap(
+            Path(dataset_path).joinpath(record.path), dtype=numpy.dtype(dtype), mode='r', offset=data.offset,
+            shape=(data.size // header.block_align, header.channels),
+        )
+    except (OSError, ValueError):
+        # Removed meanwhile, not readable or shorter than its header says (F003 reports the broken files)
+        return None
+    profiler.count(files=1)
+    # Samples stay in their own scale, only the limits and the results are divided by the full scale
+    clip_level = full_scale if 'f' in dtype else full_scale - 1
+    silence_level = SILENCE_LEVEL * full_scale
+
+    peak, sum_of_samples, sum_of_squares, clipped = 0.0, 0.0, 0.0, 0
+    first_sound: Optional[int] = None
+    last_sound: Optional[int] = None
+
+    for start in range(0, len(samples), BATCH_FRAMES):
+        batch = samples[start:start + BATCH_FRAMES].astype(numpy.float32)
+        if zero:
+            batch -= zero
+
+        absolute = numpy.abs(batch)
+        peak = max(peak, float(absolute.max()))
+        sum_of_samples += float(batch.sum(dtype=numpy.float64))
+        sum_of_squares += float(numpy.square(batch).sum(dtype=numpy.float64))
+        clipped += int(numpy.count_nonzero(absolute >= clip_level))
+
+        sound = numpy.flatnonzero(absolute.max(axis=1) > silence_level)
+        if len(sound):
+            first_sound = start + int(sound[0]) if first_sound is None else first_sound
+            last_sound = start + int(sound[-1])
+
+    frames, number_of_samples = samples.shape[0], samples.size
+    del samples
+    frames_to_ms = 1000 / header.sample_rate if header.sample_rate else 0.0
+
+    return SampleStats(
+        path=record.path,
+        peak_db=round(to_db(peak / full_scale), 2),
+        rms_db=round(to_db(math.sqrt(sum_of_squares / number_of_samples) / full_scale), 2),
+        clipping_ratio=clipped / number_of_samples,
+        dc_offset=round(sum_of_samples / number_of_samples / full_scale, 6),
+        leading_silence_ms=int((frames if first_sound is None else first_sound) * frames_to_ms),
+        trailing_silence_ms=int((frames if last_sound is None else frames - 1 - last_sound) * frames_to_ms),
+        silent=first_sound is None,
+    )
+
+
+def analyze_files(
+        dataset_path: str, records: Iterable[AudioRecord], jobs: int = 1, io_limits: IOLimits = IOLimits(),
+) -> Iterator[SampleStats]:
+    # numpy releases the GIL in its loops (and while the kernel reads pages), so threads are enough
+    analyze = partial(analyze_file, dataset_path)
+    threads = io_limits.threads or (jobs if jobs > 1 else 0)
+    if threads > 0:
+        yield from filter(None, prefetch(analyze, records, threads, io_limits.in_flight))
+    else:
+        yield from filter(None, map(analyze, records))
@@ -0,0 +1,91 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+
+class PluginScheduler:
+    def __init__(
+            self, plugins: List[Any], run_plugin: Optional[Callable[[Any], None]] = None,
+            max_running: Optional[int] = None,
+    ) -> None:
+        # run_plugin wraps the run of every plugin (like the profiler does), max_running limits concurrent plugins
+        self.run_function: Callable[[Any], None] = run_plugin or (lambda vds_plugin: vds_plugin.run())
+        self.max_running = max_running or len(plugins) or 1
+        self.plugins: Dict[str, Any] = {vds_plugin.info.id: vds_plugin for vds_plugin in plugins}
+        # Dependencies on disabled plugins are ignored
+        self.dependencies: Dict[str, Set[str]] = {
+            plugin_id: set(vds_plugin.info.dependencies) & set(self.plugins)
+            for plugin_id, vds_plugin in self.plugins.items()
+        }
+
+    def ready_plugins(self, pending: Set[str], finished: Set[str]) -> List[str]:
+        ready = [plugin_id for plugin_id in pending if self.dependencies[plugin_id] <= finished]
+        # Cheap plugins first, so their results are printed while expensive ones are still running
+        return sorted(ready, key=lambda plugin_id: (self.plugins[plugin_id].info.cost, plugin_id))
+
+    def dependents(self, plugin_ids: List[str], pending: Set[str]) -> List[str]:
+        # The given plugins and all pending plugins which depend on them, directly or not
+        found = list(plugin_ids)
+        queue = list(plugin_ids)
+        while queue:
+            current = queue.pop()
+            for dependent in sorted(pending):
+                if current in self.dependencies[dependent] and dependent not in found:
+                    found.append(dependent)
+                    queue.append(dependent)
+        return found
+
+    def skipped_plugins(self, plugin_id: str, pending: Set[str]) -> List[str]:
+        # A failed plugin with blocks() decides which dependents can't run (T001 stops only the plugins which read
+        # the missing "wavs" folder), without it any finding stops all of them
+        vds_plugin = self.plugins[plugin_id]
+        if len(vds_plugin.findings) == 0:
+            return []
+
+        blocks = getattr(vds_plugin, 'blocks', None)
+        return self.dependents([
+            dependent for dependent in sorted(pending)
+            if plugin_id in self.dependencies[dependent] and (blocks is None or blocks(self.plugins[dependent]))
+        ], pending)
+
+    def run_plugin(self, plugin_id: str, done: 'queue.Queue[Tuple[str, Optional[BaseException]]]') -> None:
+        try:
+            self.run_function(self.plugins[plugin_id])
+        except BaseException as error:  # pylint: disable=broad-except
+            # Raised again in run(), in the thread which reads the results
+            done.put((plugin_id, error))
+        else:
+            done.put((plugin_id, None))
+
+    def run(self) -> Iterator[Tuple[Any, Optional[str]]]:
+        # Yields (plugin, None) as soon as a plugin finishes or (plugin, failed_dependency_id) when it was skipped.
+        # Plain threads and a queue, concurrent.futures alone takes longer to import than a transcription-only run
+        pending = set(self.plugins)
+        finished: Set[str] = set()
+        running = 0
+        done: 'queue.Queue[Tuple[str, Optional[BaseException]]]' = queue.Queue()
+
+        while pending or running:
+            for plugin_id in self.ready_plugins(pending, finished)[:self.max_running - running]:
+                pending.remove(plugin_id)
+                threading.Thread(target=self.run_plugin, args=(plugin_id, done), name=plugin_id).start()
+                running += 1
+
+            if not running:
+                raise ValueError(f'Circular dependencies between plugins: {", ".join(sorted(pending))}')
+
+            plugin_id, error = done.get()
+            running -= 1
+
+            if error is not None:
+                # Plugins which are still running are finished before the error is raised
+                for _ in range(running):
+                    done.get()
+                raise error
+
+            yield self.plugins[plugin_id], None
+
+            for dependent in self.skipped_plugins(plugin_id, pending):
+                pending.remove(dependent)
+                yield self.plugins[dependent], plugin_id
+            finished.add(plugin_id)
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from vds.api import Options, PluginResult, validate
+from vds.cache import CACHE_FILE_NAME, ProbeCache
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return str(Path(runtime_dir) / f'vds-{os.getuid()}.sock')
+
+
+def serve_parser() -> argparse.ArgumentParser:
+    argument_parser = argparse.ArgumentParser(
+        prog='vds serve', description='Validate datasets on requests sent to a Unix socket.',
+    )
+    argument_parser.add_argument(
+        '--socket', type=str, action='store', required=False, default=default_socket_path(),
+        help='Path to the Unix socket',
+    )
+    return argument_parser
+
+
+class ProbeCaches:
+    # Caches of WAV file properties stay in memory between requests, each of them is used by one run at a time
+    def __init__(self) -> None:
+        self.caches: Dict[str, Tuple[ProbeCache, threading.Lock]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, dataset_path: str) -> Tuple[ProbeCache, threading.Lock]:
+        key = str(Path(dataset_path).resolve())
+        with self.lock:
+            if key not in self.caches:
+                self.caches[key] = (ProbeCache(Path(dataset_path) / CACHE_FILE_NAME), threading.Lock())
+            return self.caches[key]
+
+
+def result_to_dict(result: PluginResult) -> Dict[str, Any]:
+    return {
+        'plugin_id': result.plugin_id,
+        'name': result.name,
+        'status': result.status,
+        'total': result.total,
+        'failed_dependency': result.failed_dependency,
+        'findings': [finding.to_dict() for finding in result.findings],
+    }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # One JSON object per line, like {"path": "/datasets/lj", "max_errors": 100}, is answered with one JSON line
+    server: 'ValidationServer'
+
+    def handle(self) -> None:
+        for request_line in self.rfile:
+            response = self.server.process(request_line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('UTF-8') + b'\n')
+            self.wfile.flush()
+
+
+class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str) -> None:
+        self.probe_caches = ProbeCaches()
+        super().__init__(socket_path, RequestHandler)
+
+    def process(self, request_line: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(request_line)
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+            for name in ('files', 'disabled_plugins', 'enabled_plugins'):
+                if isinstance(request.get(name), list):
+                    request[name] = tuple(request[name])
+            options = Options(**request)
+        except (TypeError, ValueError) as error:
+            return {'error': str(error)}
+
+        try:
+            if not options.cache:
+                results = validate(**options._asdict())
+            else:
+                probe_cache, lock = self.probe_caches.get(options.path)
+                with lock:
+                    if options.rebuild_cache:
+                        probe_cache.clear()
+                    results = validate(probe_cache=probe_cache, **options._asdict())
+        except Exception as error:  # pylint: disable=broad-except
+            # A broken dataset or plugin must not stop the server for other clients
+            return {'error': f'{type(error).__name__}: {error}'}
+        return {'path': options.path, 'plugins': [result_to_dict(result) for result in results]}
+
+
+def remove_stale_socket(socket_path: str) -> Optional[str]:
+    # A socket left by a previous (killed) server would make bind() fail. Anything else at the path, like a regular
+    # file or the socket of a running server, is left untouched and an error message is returned instead.
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(mode):
+        return f'The path {socket_path} already exists and is not a socket'
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return None
+        except OSError as error:
+            return f'Cannot check the socket {socket_path}: {error}'
+    return f'Another server is already listening on {socket_path}'
+
+
+def main(argv: List[str]) -> int:
+    if not hasattr(socketserver, 'UnixStreamServer'):
+        print('vds serve needs Unix sockets, which are not available on this system')
+        return 1
+
+    arguments = serve_parser().parse_args(argv)
+
+    error = remove_stale_socket(arguments.socket)
+    if error:
+        print(error)
+        return 1
+
+    with ValidationServer(arguments.socket) as server:
+        print(f'Listening on {arguments.socket}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            Path(arguments.socket).unlink(missing_ok=True)
+    return 0
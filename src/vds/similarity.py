@@ -0,0 +1,143 @@
+import string
+import unicodedata
+from typing import Any, Dict, Iterator, List, Sequence, Set, Tuple
+
+# Texts are compared as sets of 5 byte long fragments (shingles)
+NGRAM = 5
+# LSH: signatures of BANDS * ROWS values, texts with the same ROWS values in any band are candidates.
+# Texts with Jaccard similarity 0.7 are found with probability 89% (0.8 - 99%), unrelated texts are rarely compared.
+BANDS = 12
+ROWS = 5
+SIGNATURE_SIZE = BANDS * ROWS
+# Candidates whose signatures agree less than this below the threshold are not compared exactly
+SIGNATURE_MARGIN = 0.2
+# Texts hashed at once, limits memory used by arrays of shingles
+CHUNK_TEXTS = 65536
+
+ASCII_PUNCTUATION = bytes.maketrans(string.punctuation.encode(), b' ' * len(string.punctuation))
+UNICODE_PUNCTUATION = str.maketrans({character: ' ' for character in '„”“‘’«»–—…¿¡'})
+
+
+def normalize_text(text: str) -> bytes:
+    # Case, punctuation and whitespace differences don't make a different sentence.
+    # Texts are kept as UTF-8 bytes, bytes.translate() is several times faster than str.translate().
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text).translate(UNICODE_PUNCTUATION)
+    return b' '.join(text.casefold().encode('UTF-8').translate(ASCII_PUNCTUATION).split())
+
+
+def shingles(text: bytes) -> Set[bytes]:
+    text = text.ljust(NGRAM)
+    return {text[index:index + NGRAM] for index in range(len(text) - NGRAM + 1)}
+
+
+def jaccard(first: Set[bytes], second: Set[bytes]) -> float:
+    return len(first & second) / len(first | second)
+
+
+class MinHash:
+    # One permutation hashing: every shingle is hashed once, the hash selects a bin of the signature
+    # and the smallest hash in a bin is kept. Empty bins are filled from the next bin (densification).
+    def __init__(self, numpy: Any) -> None:
+        self.numpy = numpy
+
+    def mix(self, values: Any) -> Any:
+        # splitmix64 finalizer, every bit of the result depends on every byte of the shingle
+        numpy = self.numpy
+        values ^= values >> numpy.uint64(30)
+        values *= numpy.uint64(0xBF58476D1CE4E5B9)
+        values ^= values >> numpy.uint64(27)
+        values *= numpy.uint64(0x94D049BB133111EB)
+        values ^= values >> numpy.uint64(31)
+        return values
+
+    def chunk_signatures(self, texts: Sequence[bytes]) -> Any:
+        numpy = self.numpy
+        padded_texts = [text.ljust(NGRAM) for text in texts]
+        lengths = numpy.fromiter((len(text) for text in padded_texts), dtype=numpy.int64, count=len(padded_texts))
+        buffer = numpy.frombuffer(b''.join(padded_texts), dtype=numpy.uint8).astype(numpy.uint64)
+
+        # Hash of the shingle starting at every byte, only shingles inside of a text are used
+        rolling = numpy.zeros(len(buffer) - NGRAM + 1, dtype=numpy.uint64)
+        for offset in range(NGRAM):
+            rolling = (rolling << numpy.uint64(8)) | buffer[offset:len(buffer) - NGRAM + 1 + offset]
+        counts = lengths - NGRAM + 1
+        starts = numpy.repeat(numpy.cumsum(lengths) - lengths - (numpy.cumsum(counts) - counts), counts)
+        hashes = self.mix(rolling[numpy.arange(len(starts)) + starts])
+
+        # Lower half of the hash selects the bin (multiply-shift, faster than a 64-bit modulo), upper half is the value
+        bins = ((hashes & numpy.uint64(0xFFFFFFFF)) * numpy.uint64(SIGNATURE_SIZE)) >> numpy.uint64(32)
+        bins += numpy.repeat(numpy.arange(len(texts), dtype=numpy.uint64) * numpy.uint64(SIGNATURE_SIZE), counts)
+        empty = numpy.uint64(1 << 32)
+        signatures = numpy.full((len(texts), SIGNATURE_SIZE), empty, dtype=numpy.uint64)
+        numpy.minimum.at(signatures.reshape(-1), bins.astype(numpy.intp), hashes >> numpy.uint64(32))
+        return self.densify(signatures, signatures == empty)
+
+    def densify(self, signatures: Any, empty: Any) -> Any:
+        # An empty bin takes the value of the next filled bin (circularly), changed by the distance between them
+        numpy = self.numpy
+        columns = numpy.arange(2 * SIGNATURE_SIZE, dtype=numpy.uint8)
+        filled = numpy.where(numpy.concatenate([empty, empty], axis=1), numpy.uint8(255), columns)
+        next_filled = numpy.minimum.accumulate(filled[:, ::-1], axis=1)[:, :SIGNATURE_SIZE - 1:-1]
+
+        values = numpy.take_along_axis(signatures, next_filled % SIGNATURE_SIZE, axis=1)
+        values += (next_filled - columns[:SIGNATURE_SIZE]).astype(numpy.uint64) * numpy.uint64(0x9E3779B9)
+        return (values & numpy.uint64(0xFFFFFFFF)).astype(numpy.uint32)
+
+    def signatures(self, texts: Sequence[bytes]) -> Any:
+        if not texts:
+            return self.numpy.zeros((0, SIGNATURE_SIZE), dtype=self.numpy.uint32)
+        return self.numpy.concatenate([
+            self.chunk_signatures(texts[start:start + CHUNK_TEXTS]) for start in range(0, len(texts), CHUNK_TEXTS)
+        ])
+
+    def candidate_pairs(self, signatures: Any, threshold: float) -> Iterator[Tuple[int, int]]:
+        # Texts with the same band are neighbours after sorting, so only neighbours are compared
+        numpy = self.numpy
+        bands = signatures.reshape(len(signatures), BANDS, ROWS)
+        keys = numpy.zeros((len(signatures), BANDS), dtype=numpy.uint64)
+        for row in range(ROWS):
+            keys = keys * numpy.uint64(0x100000001B3) + bands[:, :, row]
+
+        for band_keys in numpy.ascontiguousarray(keys.T):
+            order = numpy.argsort(band_keys)
+            sorted_keys = band_keys[order]
+            neighbours = numpy.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+            first, second = order[neighbours], order[neighbours + 1]
+
+            # Part of equal signature values estimates the similarity, clearly different texts are dropped here
+            agreement = (signatures[first] == signatures[second]).mean(axis=1)
+            keep = agreement >= threshold - SIGNATURE_MARGIN
+            yield from zip(first[keep].tolist(), second[keep].tolist())
+
+
+def find_root(parents: Dict[int, int], item: int) -> int:
+    while parents.get(item, item) != item:
+        parents[item] = parents.get(parents[item], parents[item])
+        item = parents[item]
+    return item
+
+
+def similar_groups(texts: Sequence[bytes], threshold: float = 0.7) -> List[List[int]]:
+    # Groups (indexes of texts) with Jaccard similarity of shingles at least threshold, texts must be unique
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    minhash = MinHash(numpy)
+    text_shingles: Dict[int, Set[bytes]] = {}
+    parents: Dict[int, int] = {}
+
+    for first, second in minhash.candidate_pairs(minhash.signatures(texts), threshold):
+        first_root, second_root = find_root(parents, first), find_root(parents, second)
+        if first_root == second_root:
+            continue
+
+        for index in (first, second):
+            if index not in text_shingles:
+                text_shingles[index] = shingles(texts[index])
+        if jaccard(text_shingles[first], text_shingles[second]) >= threshold:
+            parents[max(first_root, second_root)] = min(first_root, second_root)
+
+    groups: Dict[int, List[int]] = {}
+    for index in parents:
+        groups.setdefault(find_root(parents, index), []).append(index)
+    return [sorted(group + [root]) for root, group in groups.items()]
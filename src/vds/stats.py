@@ -0,0 +1,189 @@
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, TextIO, Tuple
+
+from vds.dataset import DatasetIndex
+from vds.paths import normalize_path
+from vds.riff import NOT_A_WAV_FILE
+
+HOUR_MS = 3600 * 1000
+
+
+class Distribution:
+    # Streaming histogram, values are added one by one and only counts of buckets are kept
+    __slots__ = ('bucket_size', 'count', 'total', 'minimum', 'maximum', 'histogram')
+
+    def __init__(self, bucket_size: float = 1.0) -> None:
+        self.bucket_size = bucket_size
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        bucket = int(value // self.bucket_size)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, part: float) -> float:
+        # Start of the bucket with the value, exact for integers with bucket_size 1
+        if not self.count:
+            return 0.0
+        position = part * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen > position:
+                return min(max(bucket * self.bucket_size, self.minimum), self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'min': self.minimum,
+            'mean': round(self.mean, 3),
+            'p5': self.percentile(0.05),
+            'median': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max': self.maximum,
+        }
+
+
+class SplitStats:
+    __slots__ = (
+        'name', 'lines', 'duration_ms', 'missing_wav_files', 'invalid_wav_files', 'text_length',
+        'characters_per_second',
+    )
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.lines = 0
+        self.duration_ms = 0
+        self.missing_wav_files = 0
+        self.invalid_wav_files = 0
+        self.text_length = Distribution()
+        self.characters_per_second = Distribution(bucket_size=0.5)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'lines': self.lines,
+            'hours': round(self.duration_ms / HOUR_MS, 3),
+            'missing_wav_files': self.missing_wav_files,
+            'invalid_wav_files': self.invalid_wav_files,
+            'text_length': self.text_length.to_dict(),
+            'characters_per_second': self.characters_per_second.to_dict(),
+        }
+
+
+class DatasetStats:
+    def __init__(self, dataset: DatasetIndex) -> None:
+        # One pass over the WAV headers (from the cache when it is enabled) and one over every transcription line,
+        # samples are never read
+        self.wav_files = 0
+        self.invalid_wav_files = 0
+        self.duration_ms = 0
+        self.durations = Distribution(bucket_size=100)
+        durations: Dict[str, int] = {}
+        # Lines with these files are counted apart from the missing ones, the files exist but have no duration
+        invalid_paths: Set[str] = set()
+
+        for record in dataset.audio_records():
+            self.wav_files += 1
+            if record.error == NOT_A_WAV_FILE or record.header.sample_rate == 0:
+                self.invalid_wav_files += 1
+                invalid_paths.add(record.path)
+                continue
+            durations[record.path] = record.duration_ms
+            self.duration_ms += record.duration_ms
+            self.durations.add(record.duration_ms)
+
+        self.splits = [SplitStats(transcription.name) for transcription in dataset.transcriptions]
+        for split, transcription in zip(self.splits, dataset.transcriptions):
+            for _, line, wav_path, text in transcription:
+                if line in ('', '\n\n'):
+                    continue
+
+                split.lines += 1
+                normalized_path = normalize_path(wav_path)
+                duration_ms: Optional[int] = durations.get(normalized_path)
+                if duration_ms is None and normalized_path in invalid_paths:
+                    split.invalid_wav_files += 1
+                    continue
+                if duration_ms is None:
+                    split.missing_wav_files += 1
+                    continue
+
+                split.duration_ms += duration_ms
+                split.text_length.add(len(text))
+                if duration_ms > 0:
+                    split.characters_per_second.add(len(text) * 1000 / duration_ms)
+
+    def histogram(self) -> Dict[int, int]:
+        # Number of WAV files for every full second of duration
+        seconds: Dict[int, int] = {}
+        for bucket, count in sorted(self.durations.histogram.items()):
+            second = int(bucket * self.durations.bucket_size) // 1000
+            seconds[second] = seconds.get(second, 0) + count
+        return seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wav_files': self.wav_files,
+            'invalid_wav_files': self.invalid_wav_files,
+            'hours': round(self.duration_ms / HOUR_MS, 3),
+            'duration_ms': self.durations.to_dict(),
+            'duration_histogram': {f'{second}-{second + 1}s': count for second, count in self.histogram().items()},
+            'splits': {split.name: split.to_dict() for split in self.splits},
+        }
+
+    def save(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=4) + '\n', encoding='UTF-8')
+
+    def print_tables(self, stream: TextIO) -> None:
+        from rich.console import Console  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+        from rich.table import Table  # type: ignore  # pylint: disable=import-error,import-outside-toplevel
+
+        console = Console(file=stream)
+        table = Table(title=f'Dataset: {self.duration_ms / HOUR_MS:.2f} hours in {self.wav_files} WAV files')
+
+        table.add_column('', justify='left', style='cyan', no_wrap=True)
+        for split in self.splits:
+            table.add_column(split.name, justify='right', no_wrap=True)
+
+        rows: Tuple[Tuple[str, Callable[[SplitStats], str]], ...] = (
+            ('Lines', lambda split: str(split.lines)),
+            ('Hours', lambda split: f'{split.duration_ms / HOUR_MS:.2f}'),
+            ('Missing WAV files', lambda split: str(split.missing_wav_files)),
+            ('Invalid WAV files', lambda split: str(split.invalid_wav_files)),
+            ('Text length min / median / max', lambda split: ' / '.join(
+                f'{split.text_length.percentile(part):.0f}' for part in (0, 0.5, 1)
+            )),
+            ('Characters/s p5 / median / p95', lambda split: ' / '.join(
+                f'{split.characters_per_second.percentile(part):.1f}' for part in (0.05, 0.5, 0.95)
+            )),
+        )
+        for name, value in rows:
+            table.add_row(name, *(value(split) for split in self.splits))
+        console.print(table)
+
+        histogram = Table(title='Duration of WAV files')
+        histogram.add_column('Seconds', justify='right', style='cyan', no_wrap=True)
+        histogram.add_column('Files', justify='right', no_wrap=True)
+        histogram.add_column('', justify='left', style='green', no_wrap=True)
+
+        seconds = self.histogram()
+        largest = max(seconds.values(), default=0)
+        for second, count in seconds.items():
+            histogram.add_row(f'{second}-{second + 1}', str(count), '█' * max(1, round(40 * count / largest)))
+        console.print(histogram)
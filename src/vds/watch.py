@@ -0,0 +1,331 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import time
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from vds.api import create_plugins, Options
+from vds.cache import ProbeCache
+from vds.dataset import DatasetIndex, Transcription
+from vds.findings import Finding
+from vds.prefetch import IOLimits
+from vds.scheduler import PluginScheduler
+
+# Events which come one after another within this time are checked together
+SETTLE_TIME = 0.2
+# Bytes from the end of a transcription file, compared to tell appended lines from a rewritten file
+TAIL_SIZE = 4096
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+EVENT_HEADER = struct.Struct('iIII')
+
+# WAV files are checked when they are closed after writing, not after every write() of a half-written file
+WAV_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+# Pipelines often keep transcription files open and append to them, so every write is reported
+DATASET_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+
+FindingKey = Tuple[Any, ...]
+
+
+class Changes:
+    __slots__ = ('wav_files', 'transcriptions', 'rescan')
+
+    def __init__(self) -> None:
+        # Names in the wavs folder and transcription files which were created, modified or removed
+        self.wav_files: Set[str] = set()
+        self.transcriptions: Set[str] = set()
+        # Set when the events can't be trusted anymore (lost events, the wavs folder replaced)
+        self.rescan = False
+
+    def __bool__(self) -> bool:
+        return bool(self.wav_files or self.transcriptions or self.rescan)
+
+
+class InotifyWatcher:
+    # Linux only, inotify functions are called from libc, so no extra package is needed
+    def __init__(self, path: Path, dir_name: str, files: Iterable[str]) -> None:
+        self.path = path
+        self.dir_name = dir_name
+        self.files = frozenset(files)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self.dataset_wd = self.add_watch(path, DATASET_EVENTS)
+        if self.dataset_wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f'Can not watch {path}')
+        self.wavs_wd = self.add_watch(path / dir_name, WAV_EVENTS)
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        return int(self.libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask)))
+
+    def wait(self, timeout: Optional[float] = None) -> Changes:
+        changes = Changes()
+        while not changes:
+            if not select.select([self.fd], [], [], timeout)[0]:
+                return changes
+            self.read_events(changes)
+            while select.select([self.fd], [], [], SETTLE_TIME)[0]:
+                self.read_events(changes)
+        return changes
+
+    def read_events(self, changes: Changes) -> None:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changes.rescan = True
+            elif wd == self.wavs_wd and name.endswith('.wav'):
+                changes.wav_files.add(name)
+            elif wd == self.dataset_wd and name in self.files:
+                changes.transcriptions.add(name)
+            elif wd == self.dataset_wd and name == self.dir_name:
+                # The wavs folder was created, moved or removed, nothing is known about its content
+                self.wavs_wd = self.add_watch(self.path / self.dir_name, WAV_EVENTS)
+                changes.rescan = True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Used where inotify is not available, every poll reads the properties of all files in the wavs folder
+    def __init__(self, path: Path, dir_name: str, files: Iterable[str], interval: float = 1.0) -> None:
+        self.path = path
+        self.dir_name = dir_name
+        self.files = tuple(files)
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    @staticmethod
+    def file_key(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def take_snapshot(self) -> Dict[Tuple[bool, str], Optional[Tuple[int, int]]]:
+        snapshot = {(False, name): self.file_key(self.path / name) for name in self.files}
+        try:
+            with os.scandir(self.path / self.dir_name) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.wav'):
+                        snapshot[(True, entry.name)] = self.file_key(Path(entry.path))
+        except OSError:
+            pass
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> Changes:
+        changes = Changes()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not changes and (deadline is None or time.monotonic() < deadline):
+            time.sleep(self.interval)
+            snapshot = self.take_snapshot()
+            for is_wav_file, name in snapshot.keys() | self.snapshot.keys():
+                if snapshot.get((is_wav_file, name)) != self.snapshot.get((is_wav_file, name)):
+                    (changes.wav_files if is_wav_file else changes.transcriptions).add(name)
+            self.snapshot = snapshot
+        return changes
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(path: Path, dir_name: str, files: Iterable[str], interval: float = 1.0) -> Any:
+    try:
+        return InotifyWatcher(path, dir_name, files)
+    except (AttributeError, OSError):
+        return PollingWatcher(path, dir_name, files, interval)
+
+
+class TranscriptionState(NamedTuple):
+    size: int
+    tail: bytes
+    last_line_offset: int
+    last_line_number: int
+
+
+def transcription_state(transcription: Transcription) -> Optional[TranscriptionState]:
+    # Size and the last line come from the line index of the dataset, only the tail of the file is read
+    if not transcription.exists:
+        return None
+    try:
+        with open(transcription.path, 'rb') as file:
+            file.seek(max(0, transcription.size - TAIL_SIZE))
+            tail = file.read(min(transcription.size, TAIL_SIZE))
+    except OSError:
+        return None
+    return TranscriptionState(
+        transcription.size, tail, transcription.line_offsets[-1], transcription.number_of_lines,
+    )
+
+
+def appended_lines(path: Path, state: Optional[TranscriptionState]) -> Tuple[int, int]:
+    # Offset and number of the first line to check, the last known line is checked again because it could be
+    # incomplete. A file with a different tail was rewritten and all its lines are checked.
+    if state is not None:
+        try:
+            with open(path, 'rb') as file:
+                file.seek(state.size - len(state.tail))
+                if file.read(len(state.tail)) == state.tail:
+                    return state.last_line_offset, state.last_line_number
+        except OSError:
+            pass
+    return 0, 1
+
+
+def finding_key(finding: Finding) -> FindingKey:
+    return finding[:6] + (json.dumps(dict(finding.details), sort_keys=True), finding.level)
+
+
+def plugin_scope(plugin_module: ModuleType) -> str:
+    # 'line' plugins check every transcription line alone, 'wav' plugins every WAV file alone,
+    # 'dataset' plugins (and plugins without a scope) compare files with each other, so they check everything
+    scope = getattr(plugin_module.ValidDataSetPlugin.info, 'scope', 'dataset')
+    return scope if scope in ('line', 'wav') else 'dataset'
+
+
+def plugin_inputs(plugin_module: ModuleType) -> Tuple[str, ...]:
+    # What a 'dataset' plugin reads: 'transcriptions' and (or) 'wav_files' (the listing and the files)
+    return tuple(getattr(plugin_module.ValidDataSetPlugin.info, 'inputs', ('transcriptions', 'wav_files')))
+
+
+class WatchResult(NamedTuple):
+    vds_plugin: Any
+    new: List[Finding]
+    resolved: List[Finding]
+    failed_dependency: Optional[str] = None
+
+
+class WatchSession:
+    # Keeps findings of the last run, so each run reports only new and resolved findings
+    def __init__(self, options: Options, plugin_modules: List[ModuleType], probe_cache: Optional[ProbeCache]) -> None:
+        # All findings are needed to compare runs, --max-errors only limits what is printed
+        self.options = options._replace(max_errors=None)
+        self.plugin_modules = plugin_modules
+        self.probe_cache = probe_cache
+        self.findings: Dict[str, Dict[FindingKey, Finding]] = {}
+        self.transcriptions: Dict[str, Optional[TranscriptionState]] = {}
+        # Index of the last run, next runs read only the changed files into it
+        self.index: Optional[DatasetIndex] = None
+        self.complete = False
+
+    @property
+    def total(self) -> int:
+        return sum(len(findings) for findings in self.findings.values())
+
+    def dataset(self, **limits: Any) -> DatasetIndex:
+        return DatasetIndex(
+            path=self.options.path,
+            files=list(limits.pop('files', self.options.files)),
+            dir_name=self.options.dir_name,
+            jobs=self.options.jobs,
+            io_limits=IOLimits(self.options.io_threads, self.options.io_in_flight),
+            **limits,
+        )
+
+    def run(self, changes: Optional[Changes] = None) -> Iterator[WatchResult]:
+        # Without changes (the first run) or after lost events the whole dataset is checked
+        path = Path(self.options.path)
+        if changes is None or changes.rescan or not self.complete or self.index is None:
+            line_offsets = {name: (0, 1) for name in self.options.files}
+            wav_paths = None
+            changed_inputs = {'transcriptions', 'wav_files'}
+            self.index = self.dataset(cache=self.probe_cache)
+            datasets = {'dataset': self.index, 'line': self.index, 'wav': self.index}
+        else:
+            line_offsets = {
+                name: appended_lines(path / name, self.transcriptions.get(name))
+                for name in self.options.files if name in changes.transcriptions
+            }
+            wav_paths = {str(Path(self.options.dir_name, name)) for name in changes.wav_files}
+            changed_inputs = {'transcriptions'} if line_offsets else set()
+            changed_inputs.update(['wav_files'] if wav_paths else [])
+            self.index = self.index.updated(line_offsets, changes.wav_files)
+            datasets = {'dataset': self.index}
+            listing = self.index.directory_files
+            if line_offsets:
+                datasets['line'] = self.dataset(
+                    files=list(line_offsets), line_offsets=line_offsets, wav_names=(), directory_files=listing,
+                )
+            if wav_paths:
+                datasets['wav'] = self.dataset(files=[], wav_names=changes.wav_files, directory_files=listing)
+
+        scopes: Dict[str, str] = {}
+        plugins: List[Any] = []
+        for scope, scope_dataset in datasets.items():
+            # 'dataset' plugins whose inputs have not changed keep their findings
+            scope_modules = [
+                module for module in self.plugin_modules
+                if plugin_scope(module) == scope and (scope != 'dataset' or changed_inputs & set(plugin_inputs(module)))
+            ]
+            plugins += create_plugins(self.options, scope_modules, dataset=scope_dataset)
+            scopes.update((module.ValidDataSetPlugin.info.id, scope) for module in scope_modules)
+
+        # Taken before the plugins run, lines appended while they run are checked again by the next run
+        states = {
+            transcription.name: transcription_state(transcription)
+            for transcription in self.index.transcriptions if transcription.name in line_offsets
+        }
+
+        # Skipped plugins did not check the changes, so the next run checks the whole dataset again
+        self.complete = True
+        for vds_plugin, failed_dependency in PluginScheduler(plugins).run():
+            if failed_dependency:
+                self.complete = False
+                yield WatchResult(vds_plugin, [], [], failed_dependency)
+                continue
+
+            scope = scopes[vds_plugin.info.id]
+            yield self.update(vds_plugin, partial(self.replaced, scope, line_offsets, wav_paths))
+
+        self.transcriptions.update(states)
+
+    @staticmethod
+    def replaced(
+            scope: str, line_offsets: Dict[str, Tuple[int, int]], wav_paths: Optional[Set[str]], finding: Finding,
+    ) -> bool:
+        # True for old findings in the part of the dataset checked again by the plugin
+        if scope == 'line':
+            return finding.file in line_offsets and (
+                finding.line_number is None or finding.line_number >= line_offsets[finding.file][1]
+            )
+        if scope == 'wav' and wav_paths is not None:
+            return finding.wav_path in wav_paths
+        return True
+
+    def update(self, vds_plugin: Any, replaced: Callable[[Finding], bool]) -> WatchResult:
+        old_findings = self.findings.get(vds_plugin.info.id, {})
+        findings = {key: finding for key, finding in old_findings.items() if not replaced(finding)}
+        findings.update((finding_key(finding), finding) for finding in vds_plugin.findings)
+        self.findings[vds_plugin.info.id] = findings
+
+        return WatchResult(
+            vds_plugin,
+            new=[finding for key, finding in findings.items() if key not in old_findings],
+            resolved=[finding for key, finding in old_findings.items() if key not in findings],
+        )
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from vds.dataset import DatasetIndex, Transcription
+
+# Every newline style of the universal newlines mode, with and without a line ending at the end of the file
+CONTENTS = [
+    b'a.wav|One.\nb.wav|Two.\n',
+    b'a.wav|One.\r\nb.wav|Two.\rc.wav|Three|3.\n\nd.wav|Four.',
+    b'a.wav|One.\r\r\n\xc5\xbc.wav|\xc5\xbb\xc3\xb3\xc5\x82w.\r',
+    b'',
+]
+
+
+@pytest.mark.unit
+def test_line_offsets_are_a_compact_array(tmp_path: Path) -> None:
+    path = tmp_path / 'list_train.txt'
+    path.write_bytes(b'a.wav|One.\r\nb.wav|Two.\rc.wav|Three.\n')
+
+    transcription = Transcription(path.name, path)
+
+    assert transcription.line_offsets.typecode == 'Q'
+    assert transcription.line_offsets.itemsize == 8
+    assert list(transcription.line_offsets) == [0, 12, 23, 36]
+    assert transcription.size == 36
+    assert len(transcription) == 4
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('content', CONTENTS)
+def test_indexed_lines_match_streamed_lines(tmp_path: Path, content: bytes) -> None:
+    path = tmp_path / 'list_train.txt'
+    path.write_bytes(content)
+
+    transcription = Transcription(path.name, path)
+    lines = list(transcription)
+
+    assert [line.line for line in lines] == path.read_text(encoding='UTF-8').split('\n')
+    assert len(transcription) == len(lines)
+    assert [transcription.line(line.line_number) for line in lines] == lines
+
+
+@pytest.mark.unit
+def test_lines_from_start_offset(tmp_path: Path) -> None:
+    path = tmp_path / 'list_train.txt'
+    path.write_bytes(b'a.wav|One.\nb.wav|Two.\nc.wav|Three.')
+
+    transcription = Transcription(path.name, path, start_offset=11, first_line_number=2)
+
+    assert list(transcription.line_offsets) == [11, 22]
+    assert [line.line_number for line in transcription] == [2, 3]
+    assert transcription.line(3).transcription == 'Three.'
+    with pytest.raises(IndexError):
+        transcription.line(1)
+
+
+@pytest.mark.unit
+def test_appended_lines_extend_the_index(tmp_path: Path) -> None:
+    path = tmp_path / 'list_train.txt'
+    path.write_bytes(b'a.wav|One.\nb.wav|Tw')
+    transcription = Transcription(path.name, path)
+    with open(path, 'ab') as file:
+        file.write(b'o.\r\nc.wav|Three.\n')
+
+    appended = transcription.appended(transcription.number_of_lines)
+
+    assert list(appended.line_offsets) == list(Transcription(path.name, path).line_offsets)
+    assert list(appended) == list(Transcription(path.name, path))
+
+
+@pytest.mark.unit
+def test_updated_index_reads_only_changed_files(tmp_path: Path) -> None:
+    (tmp_path / 'wavs').mkdir()
+    for name in ('a.wav', 'b.wav'):
+        (tmp_path / 'wavs' / name).write_bytes(b'')
+    (tmp_path / 'list_train.txt').write_text('wavs/a.wav|One.\n', encoding='UTF-8')
+    (tmp_path / 'list_val.txt').write_text('wavs/b.wav|Two.\n', encoding='UTF-8')
+    files = ['list_train.txt', 'list_val.txt']
+    index = DatasetIndex(str(tmp_path), files, 'wavs')
+
+    (tmp_path / 'wavs' / 'b.wav').unlink()
+    (tmp_path / 'wavs' / 'c.wav').write_bytes(b'')
+    with open(tmp_path / 'list_train.txt', 'a', encoding='UTF-8') as file:
+        file.write('wavs/c.wav|Three.\n')
+    updated = index.updated({'list_train.txt': (16, 2)}, ['b.wav', 'c.wav'])
+
+    full = DatasetIndex(str(tmp_path), files, 'wavs')
+    assert updated.directory_files == full.directory_files
+    assert updated.wav_files == ('wavs/a.wav', 'wavs/c.wav')
+    assert updated.transcriptions[1] is index.transcriptions[1]
+    assert [list(transcription) for transcription in updated.transcriptions] == [
+        list(transcription) for transcription in full.transcriptions
+    ]
+    assert updated.manifest() == full.manifest()
@@ -0,0 +1,144 @@
+import errno
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, Tuple
+
+import numpy
+import pytest
+from scipy.io import wavfile
+
+from vds import repair
+from vds.dataset import DatasetIndex
+from vds.repair import fix_dataset, fix_transcription, fix_wav_file, replace_file, TranscriptionFix
+from vds.riff import HAS_METADATA, scan_file, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM
+
+SAMPLE_RATE = 22050
+# Chunks written by audio editors, an odd size checks the padding byte
+METADATA_CHUNKS = [(b'LIST', b'INFOISFT\x04\x00\x00\x00vds\x00'), (b'id3 ', b'ID3\x03\x00')]
+
+
+def write_wav(path: Path, format_tag: int, samples: numpy.ndarray, chunks: List[Tuple[bytes, bytes]]) -> None:
+    # Mono file with the given chunks between the fmt and the data chunk
+    sample_size = samples.dtype.itemsize
+    fmt = struct.pack('<HHIIHH', format_tag, 1, SAMPLE_RATE, SAMPLE_RATE * sample_size, sample_size, sample_size * 8)
+    data = samples.astype(f'<{samples.dtype.char}').tobytes()
+    body = b''.join(
+        struct.pack('<4sI', chunk_id, len(payload)) + payload + b'\x00' * (len(payload) % 2)
+        for chunk_id, payload in [(b'fmt ', fmt), *chunks, (b'data', data)]
+    )
+    path.write_bytes(struct.pack('<4sI4s', b'RIFF', 4 + len(body), b'WAVE') + body)
+
+
+def chunk_payloads(path: Path) -> List[Tuple[bytes, bytes]]:
+    content = path.read_bytes()
+    return [(chunk.id, content[chunk.offset:chunk.offset + chunk.size]) for chunk in scan_file(path).chunks]
+
+
+@pytest.mark.unit
+def test_fix_wav_file_keeps_samples(tmp_path: Path) -> None:
+    path = tmp_path / 'pcm.wav'
+    samples = numpy.random.default_rng(0).integers(-32768, 32767, 1001, dtype=numpy.int16)
+    write_wav(path, WAVE_FORMAT_PCM, samples, METADATA_CHUNKS)
+    assert scan_file(path).error == HAS_METADATA
+
+    assert fix_wav_file(path)
+
+    header = scan_file(path)
+    assert header.error is None
+    assert [chunk.id for chunk in header.chunks] == [b'fmt ', b'data']
+    sample_rate, fixed_samples = wavfile.read(path)
+    assert sample_rate == SAMPLE_RATE
+    numpy.testing.assert_array_equal(fixed_samples, samples)
+
+
+@pytest.mark.unit
+def test_fix_wav_file_keeps_fact_chunk_of_float_files(tmp_path: Path) -> None:
+    path = tmp_path / 'float.wav'
+    samples = numpy.random.default_rng(0).uniform(-1, 1, 999).astype(numpy.float32)
+    fact = (b'fact', struct.pack('<I', len(samples)))
+    write_wav(path, WAVE_FORMAT_IEEE_FLOAT, samples, [fact, *METADATA_CHUNKS])
+
+    assert fix_wav_file(path)
+
+    assert [chunk_id for chunk_id, _ in chunk_payloads(path)] == [b'fmt ', b'fact', b'data']
+    assert chunk_payloads(path)[1] == fact
+    numpy.testing.assert_array_equal(wavfile.read(path)[1], samples)
+
+
+@pytest.mark.unit
+def test_fix_wav_file_leaves_files_without_metadata(tmp_path: Path) -> None:
+    path = tmp_path / 'clean.wav'
+    write_wav(path, WAVE_FORMAT_PCM, numpy.zeros(100, dtype=numpy.int16), [])
+    content = path.read_bytes()
+
+    assert not fix_wav_file(path)
+    assert path.read_bytes() == content
+
+
+@pytest.mark.unit
+def test_interrupted_fix_leaves_original_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / 'pcm.wav'
+    write_wav(path, WAVE_FORMAT_PCM, numpy.arange(1000, dtype=numpy.int16), METADATA_CHUNKS)
+    content = path.read_bytes()
+
+    def copy_until_disk_is_full(_: BinaryIO, target: BinaryIO, __: int, size: int) -> None:
+        target.write(b'\x00' * (size // 2))
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    monkeypatch.setattr(repair, 'copy_range', copy_until_disk_is_full)
+    with pytest.raises(OSError):
+        fix_wav_file(path)
+
+    assert path.read_bytes() == content
+    assert os.listdir(tmp_path) == ['pcm.wav']
+
+
+@pytest.mark.unit
+def test_replace_file_keeps_mode_and_owner(tmp_path: Path) -> None:
+    path = tmp_path / 'list.txt'
+    path.write_bytes(b'old\n')
+    path.chmod(0o640)
+    # Only root can give a file to another user, others check that their own files stay theirs
+    owner = (1234, 1234) if os.geteuid() == 0 else (os.getuid(), os.getgid())
+    os.chown(path, *owner)
+
+    assert replace_file(path, lambda target: target.write(b'new\n') > 0)
+
+    stat = path.stat()
+    assert path.read_bytes() == b'new\n'
+    assert stat.st_mode & 0o777 == 0o640
+    assert (stat.st_uid, stat.st_gid) == owner
+
+
+@pytest.mark.unit
+def test_fix_transcription_drops_empty_and_repeated_lines(tmp_path: Path) -> None:
+    path = tmp_path / 'list.txt'
+    path.write_bytes(b'wavs/a.wav|One.\n\nwavs/b.wav|Two.\r\nwavs/a.wav|One.\n')
+
+    assert fix_transcription('list.txt', path) == TranscriptionFix('list.txt', 1, 1)
+    assert path.read_bytes() == b'wavs/a.wav|One.\nwavs/b.wav|Two.\r\n'
+
+
+@pytest.mark.unit
+def test_fix_dataset_counts_transcriptions_which_cannot_be_written(
+        tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / 'wavs').mkdir()
+    for name in ('list_train.txt', 'list_val.txt'):
+        (tmp_path / name).write_bytes(b'wavs/a.wav|One.\n\n')
+    mkstemp = repair.tempfile.mkstemp
+
+    def read_only_train_list(*args: str, **kwargs: str) -> Tuple[int, str]:
+        # Like a folder without write permission, which root (running the tests in containers) would ignore
+        if kwargs['prefix'].startswith('.list_train.txt'):
+            raise PermissionError(errno.EACCES, 'Permission denied', kwargs['dir'])
+        return mkstemp(*args, **kwargs)
+
+    monkeypatch.setattr(repair.tempfile, 'mkstemp', read_only_train_list)
+    summary = fix_dataset(DatasetIndex(str(tmp_path), ['list_train.txt', 'list_val.txt'], 'wavs'))
+
+    assert summary.failed_transcriptions == ['list_train.txt']
+    assert summary.transcriptions == [TranscriptionFix('list_val.txt', 1, 0)]
+    assert (tmp_path / 'list_train.txt').read_bytes() == b'wavs/a.wav|One.\n\n'
+    assert (tmp_path / 'list_val.txt').read_bytes() == b'wavs/a.wav|One.\n'
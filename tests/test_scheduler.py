@@ -0,0 +1,48 @@
+import wave
+from pathlib import Path
+
+import pytest
+
+from vds.api import validate
+
+SAMPLE_RATE = 22050
+
+
+def write_dataset(path: Path, wavs: bool = True) -> None:
+    # One valid 3 second recording in list_train.txt, list_val.txt is missing
+    if wavs:
+        (path / 'wavs').mkdir()
+        with wave.open(str(path / 'wavs' / 'a.wav'), 'wb') as file:
+            file.setnchannels(1)
+            file.setsampwidth(2)
+            file.setframerate(SAMPLE_RATE)
+            file.writeframes(b'\x01\x00' * SAMPLE_RATE * 3)
+    (path / 'list_train.txt').write_text('wavs/a.wav|Hello there.', encoding='UTF-8')
+
+
+@pytest.mark.unit
+def test_missing_transcription_file_skips_no_plugin(tmp_path: Path) -> None:
+    write_dataset(tmp_path)
+
+    results = {result.plugin_id: result for result in validate(tmp_path, cache=False)}
+
+    assert [finding.file for finding in results['T001'].findings] == ['list_val.txt']
+    assert [plugin_id for plugin_id, result in results.items() if result.status == 'skip'] == []
+    assert results['F002'].status == 'ok'
+    assert results['T003'].status == 'fail'
+
+
+@pytest.mark.unit
+def test_missing_wavs_folder_skips_wav_plugins(tmp_path: Path) -> None:
+    write_dataset(tmp_path, wavs=False)
+
+    results = validate(tmp_path, cache=False)
+
+    assert {result.plugin_id for result in results if result.status == 'skip'} == {
+        result.plugin_id for result in results if result.plugin_id.startswith('F')
+    }
+    assert {result.failed_dependency for result in results if result.status == 'skip'} == {'T001'}
+    # Only the missing list_val.txt, the lines of list_train.txt are checked
+    assert [finding.file for result in results if result.plugin_id == 'T005' for finding in result.findings] == [
+        'list_val.txt',
+    ]
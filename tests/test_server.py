@@ -0,0 +1,38 @@
+import socket
+from pathlib import Path
+
+import pytest
+
+from vds.server import remove_stale_socket
+
+
+@pytest.mark.unit
+def test_remove_stale_socket(tmp_path: Path) -> None:
+    path = tmp_path / 'vds.sock'
+    # Bound but closed, like the socket of a killed server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+
+    assert remove_stale_socket(str(path)) is None
+    assert not path.exists()
+    assert remove_stale_socket(str(path)) is None
+
+
+@pytest.mark.unit
+def test_remove_stale_socket_keeps_other_files(tmp_path: Path) -> None:
+    path = tmp_path / 'vds.sock'
+    path.write_text('data', encoding='UTF-8')
+
+    assert remove_stale_socket(str(path)) == f'The path {path} already exists and is not a socket'
+    assert path.read_text(encoding='UTF-8') == 'data'
+
+
+@pytest.mark.unit
+def test_remove_stale_socket_keeps_socket_of_running_server(tmp_path: Path) -> None:
+    path = tmp_path / 'vds.sock'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+
+        assert remove_stale_socket(str(path)) == f'Another server is already listening on {path}'
+        assert path.exists()